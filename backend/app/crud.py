@@ -32,7 +32,7 @@ def create_db_connection(db: Session, payload: schemas.DBConnectionCreate):
         The newly created DBConnection model instance.
     """
     # Instantiate a new DBConnection model by unpacking the payload dictionary
-    db_obj = models.DBConnection(**payload.dict())
+    db_obj = models.DBConnection(**payload.model_dump())
     db.add(db_obj)      # Add the new object to the session
     db.commit()         # Commit transaction to persist changes
     db.refresh(db_obj)  # Refresh to get updated data (e.g., autogenerated IDs)
@@ -60,6 +60,22 @@ def delete_db_connection(db: Session, connection_id: UUID) -> bool:
     db.commit()        # Commit changes to the database
     return True
 
+def db_connection_exists(db: Session, connection_id: UUID) -> bool:
+    """
+    Check whether a DBConnection with the specified ID exists.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        connection_id (UUID): Unique identifier of the DBConnection.
+
+    Returns:
+        True if the connection exists; False otherwise.
+    """
+    # EXISTS query returns a single boolean without loading the row
+    return db.query(
+        db.query(models.DBConnection.id).filter(models.DBConnection.id == connection_id).exists()
+    ).scalar()
+
 def create_column_rule(db: Session, connection_id: UUID, table: str, column: str,
                        rule_name: str, rule_text: str, severity: str, interval: str,
                        description: str, active: bool = True):
@@ -135,10 +151,13 @@ def update_column_rule(db: Session, rule_id: UUID, new_name: str, new_text: str,
     db.refresh(rule)   # Refresh to reflect updated data
     return rule
 
-from sqlalchemy import func
+from sqlalchemy import func, select
 from .models import ColumnRule, RuleResult, RuleRun
 import datetime
 
+# Rows fetched per round trip when streaming dashboard results
+RESULTS_BATCH_SIZE = 200
+
 def get_dashboard_kpis(
     db: Session,
     conn_id: UUID,
@@ -208,7 +227,8 @@ def get_dashboard_kpis(
     if date_to:
         checked_rows_query = checked_rows_query.filter(models.RuleRun.end_time <= datetime.datetime.combine(date_to, datetime.time.max))
 
-    checked_rows = checked_rows_query.scalar() or 0
+    # SUM over a BIGINT column yields NUMERIC (Decimal); keep the arithmetic in ints
+    checked_rows = int(checked_rows_query.scalar() or 0)
 
     # Compute compliance rate only if there is data
     if checked_rows > 0:
@@ -356,14 +376,14 @@ def get_column_rule_by_name(db: Session, rule_name: str) -> ColumnRule | None:
 
 def get_rule_names(db: Session, conn_id: UUID) -> list[str]:
     """Return all distinct rule names for a connection."""
-    rows = (
-        db.query(models.ColumnRule.rule_name)
-        .filter(models.ColumnRule.db_connection_id == conn_id)
+    # Scalar select of the single column returns plain strings without building Row objects
+    stmt = (
+        select(models.ColumnRule.rule_name)
+        .where(models.ColumnRule.db_connection_id == conn_id)
         .distinct()
         .order_by(models.ColumnRule.rule_name)
-        .all()
     )
-    return [r.rule_name for r in rows]
+    return db.execute(stmt).scalars().all()
 
 def get_dashboard_results(
     db: Session,
@@ -374,7 +394,16 @@ def get_dashboard_results(
     rule_names: list[str] | None = None,
     offset: int = 0,
 ):
-    """Retrieve recent rule results for a connection with optional date range."""
+    """
+    Retrieve recent rule results for a connection with optional date range.
+
+    Returns:
+        dict: ``total`` holds the number of matching results and ``items`` a
+        generator of result dicts. Rows are fetched from a server-side cursor
+        in batches of ``RESULTS_BATCH_SIZE``, so the caller can stream a page
+        without holding all rows in memory. The session must stay open until
+        the generator is exhausted.
+    """
     query = (
         db.query(models.RuleResult, models.ColumnRule.rule_name)
         .join(models.ColumnRule, models.RuleResult.rule_id == models.ColumnRule.id)
@@ -399,12 +428,12 @@ def get_dashboard_results(
         query.order_by(models.RuleResult.detected_at.desc())
         .offset(offset)
         .limit(limit)
-        .all()
+        .yield_per(RESULTS_BATCH_SIZE)
     )
 
     return {
         "total": total,
-        "items": [
+        "items": (
             {
                 "id": r.RuleResult.id,
                 "detected_at": r.RuleResult.detected_at,
@@ -413,5 +442,5 @@ def get_dashboard_results(
                 "rule_name": r.rule_name,
             }
             for r in rows
-        ],
+        ),
     }
@@ -6,10 +6,11 @@ from dotenv import load_dotenv
 # Load environment variables from a .env file into the environment
 load_dotenv()
 
+import psycopg2
 from tenacity import retry, wait_fixed, stop_after_attempt
-from sqlalchemy.exc import OperationalError
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -28,35 +29,81 @@ DATABASE_URL = os.getenv(
     f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
+def probe_database():
+    """
+    Check once that the PostgreSQL database accepts connections.
+
+    Opens and closes a raw psycopg2 connection with a 2 second connect timeout.
+    Probing with psycopg2 directly avoids building a throwaway SQLAlchemy engine
+    (dialect, pool, registry) on every attempt. Non-PostgreSQL URLs such as the
+    SQLite database used by the tests are considered reachable.
+
+    Raises:
+        psycopg2.OperationalError: If the database cannot be reached.
+    """
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "postgresql":
+        # Nothing to wait for with embedded databases such as SQLite
+        return
+    # Same argument mapping as SQLAlchemy's psycopg2 dialect (query args such as ?host= pass through)
+    connect_args = url.translate_connect_args(username="user", database="dbname")
+    connect_args.update(url.query)
+    connection = psycopg2.connect(**connect_args, connect_timeout=2)
+    # Connection successful, database is ready
+    connection.close()
+
 @retry(stop=stop_after_attempt(10), wait=wait_fixed(2))
 def wait_for_postgres():
     """
     Retry logic to wait for the PostgreSQL database to become available.
 
-    This function attempts to create a connection to the database up to 10 times,
-    waiting 2 seconds between attempts. If the database is not reachable (OperationalError),
-    it raises the exception to trigger a retry. This is useful in containerized or
-    distributed environments where the database might not be immediately ready.
+    This function probes the database up to 10 times, waiting 2 seconds between
+    attempts. It blocks, so it is meant for one-off scripts such as
+    ``init_db.py``; the API server probes in the background on startup instead
+    (see ``main.lifespan``) so that it can bind its socket immediately.
     """
-    try:
-        test_engine = create_engine(DATABASE_URL)
-        with test_engine.connect() as connection:
-            # Connection successful, database is ready
-            pass
-    except OperationalError as e:
-        # Database is not ready yet, raise to trigger retry
-        raise e
-
-# Wait until the PostgreSQL database is accessible before proceeding
-wait_for_postgres()
-
-# Create a SQLAlchemy engine instance that manages connections to the database
-engine = create_engine(DATABASE_URL)
+    probe_database()
+
+# Connection pool settings. Every request handler checks out a pooled connection
+# via get_db(), so the pool size bounds how many requests can hit the database
+# concurrently. Keep DB_POOL_SIZE + DB_MAX_OVERFLOW (per worker process) below
+# the server's max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # seconds before a connection is replaced
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+# Compiled-statement cache entries per engine (SQLAlchemy's default is 500). The
+# dashboard queries come in many filter combinations, so keep more of them cached.
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+
+# SQLite (used by the test suite) relies on its own pool classes, which do not
+# accept the QueuePool sizing arguments.
+if DATABASE_URL.startswith("sqlite"):
+    engine_options = {}
+else:
+    engine_options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
+# Create a SQLAlchemy engine instance that manages connections to the database.
+# pool_pre_ping transparently replaces connections dropped by the server.
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    query_cache_size=DB_QUERY_CACHE_SIZE,
+    **engine_options,
+)
 
 # Create a configured "Session" class for database transactions
 # autocommit=False: transactions must be committed explicitly
 # autoflush=False: changes are not automatically flushed to the database
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: loaded attributes stay valid after commit, so building the
+#   response does not re-SELECT every committed object (the CRUD helpers refresh
+#   explicitly where server-side values are needed)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for ORM models to inherit from
 # This class maintains a catalog of all model classes and tables
@@ -66,8 +113,20 @@ Base = declarative_base()
 # This ensures that when create_all() is called, tables for all models are created
 from app import models  # noqa: F401
 
-# Create all tables in the database that are defined by the ORM models
-Base.metadata.create_all(bind=engine)
+def init_db():
+    """
+    Create all tables defined by the ORM models that do not exist yet.
+
+    Deployments run this once (``python init_db.py``) instead of every worker
+    process issuing the catalog lookups on import. The Postgres init scripts in
+    ``initdb/`` already create the schema for the bundled setups.
+    """
+    Base.metadata.create_all(bind=engine)
+
+# Create the tables on import only when explicitly requested
+if os.getenv("RUN_DB_INIT", "0") == "1":
+    wait_for_postgres()
+    init_db()
 
 def get_db():
     """
@@ -87,5 +146,6 @@ def get_db():
     try:
         yield db
     finally:
-        # Close the session to free up the connection back to the pool
+        # Close the session to free up the connection back to the pool; this also
+        # expunges all objects so no identity map outlives the request
         db.close()
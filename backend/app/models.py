@@ -1,7 +1,6 @@
 """SQLAlchemy ORM models used by the Valiax backend."""
 
-import uuid
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, JSON, Integer, Boolean
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, JSON, BigInteger, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -17,8 +16,9 @@ class DBConnection(Base):
     """
     __tablename__ = "db_connections"
 
-    # Unique identifier for each DB connection, using UUID for global uniqueness
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Unique identifier for each DB connection, using UUID for global uniqueness.
+    # Generated by Postgres on INSERT and returned via RETURNING.
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
 
     # Human-readable name for the connection (e.g., 'Production DB')
     name = Column(String, nullable=False)
@@ -36,9 +36,17 @@ class ColumnRule(Base):
     the SQL or logic text of the rule, severity, and the frequency at which it should run.
     """
     __tablename__ = "column_rules"
+    __table_args__ = (
+        # list_rules_for_column filters on exactly these three columns
+        Index("ix_column_rules_conn_table_col", "db_connection_id", "table_name", "column_name"),
+        # get_column_rule_by_name looks rules up by name
+        Index("ix_column_rules_rule_name", "rule_name"),
+        # The worker selects due rules by active flag and interval
+        Index("ix_column_rules_interval_active", "interval", "active"),
+    )
 
     # Unique identifier for each rule, using UUID for global uniqueness
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
 
     # Foreign key linking this rule to a specific database connection.
     # Cascade delete ensures rules are deleted if the DB connection is removed.
@@ -84,9 +92,14 @@ class RuleResult(Base):
     of rule execution over time.
     """
     __tablename__ = "rule_results"
+    __table_args__ = (
+        # Dashboard queries join on rule_id and filter/group by detected_at
+        Index("ix_rule_results_rule_id_detected_at", "rule_id", "detected_at"),
+        Index("ix_rule_results_detected_at", "detected_at"),
+    )
 
     # Unique identifier for each rule result entry, using UUID for global uniqueness
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
 
     # Timestamp when the rule was evaluated, defaults to the current time on the server
     detected_at = Column(
@@ -111,11 +124,11 @@ class RuleRun(Base):
     """
     __tablename__ = "rule_runs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     rule_id = Column(UUID(as_uuid=True), ForeignKey("column_rules.id", ondelete="CASCADE"), nullable=False)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
-    duration_ms = Column(Integer, nullable=True)
-    checked_rows = Column(Integer, nullable=True)
-    failed_rows = Column(Integer, nullable=True)
+    duration_ms = Column(BigInteger, nullable=True)
+    checked_rows = Column(BigInteger, nullable=True)
+    failed_rows = Column(BigInteger, nullable=True)
     status = Column(String, nullable=True)
\ No newline at end of file
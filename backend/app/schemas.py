@@ -1,7 +1,7 @@
 """Pydantic schema definitions for API request and response models."""
 
 import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 from typing import List, Dict
 
@@ -22,8 +22,7 @@ class DBConnectionRead(DBConnectionCreate):
     Used when listing or retrieving connection details.
     """
     id: UUID  # Unique identifier for the connection
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ConnectionTestRequest(BaseModel):
@@ -74,8 +73,7 @@ class ColumnRuleRead(BaseModel):
     active: bool
     created_at: datetime.datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RuleResultRead(BaseModel):
@@ -88,8 +86,7 @@ class RuleResultRead(BaseModel):
     rule_id: UUID  # Reference to the evaluated rule
     result: Dict  # Arbitrary JSON result (e.g., violation details)
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DashboardKPI(BaseModel):
@@ -102,8 +99,7 @@ class DashboardKPI(BaseModel):
     affected_tables: int  # Number of tables with violations
     compliance_rate: float  # Percentage of rules passing (0.0 - 1.0)
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DashboardTrendItem(BaseModel):
@@ -115,8 +111,7 @@ class DashboardTrendItem(BaseModel):
     rule_name: str  # Name of the rule being tracked
     count: int  # Number of violations on the given date
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Specific models for top violations in dashboard analytics
@@ -128,8 +123,7 @@ class TopRuleItem(BaseModel):
     rule_name: str  # Name of the rule
     count: int  # Number of times this rule was violated
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TopTableItem(BaseModel):
     """
@@ -139,8 +133,7 @@ class TopTableItem(BaseModel):
     table_name: str  # Name of the affected table
     count: int  # Number of violations on this table
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class DashboardTopViolations(BaseModel):
     """
@@ -150,8 +143,7 @@ class DashboardTopViolations(BaseModel):
     top_rules: List[TopRuleItem]  # List of top violated rules
     top_tables: List[TopTableItem]  # List of top affected tables
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DashboardResultItem(BaseModel):
@@ -162,8 +154,7 @@ class DashboardResultItem(BaseModel):
     rule_name: str
     result: Dict
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DashboardResultPage(BaseModel):
@@ -0,0 +1,13 @@
+"""
+init_db.py
+
+One-shot command that creates the Valiax database tables defined by the ORM
+models. Run it once per deployment, e.g. ``python init_db.py``, before starting
+the API workers.
+"""
+from app.database import init_db, wait_for_postgres
+
+if __name__ == "__main__":
+    # Block until the database accepts connections, then create the tables
+    wait_for_postgres()
+    init_db()
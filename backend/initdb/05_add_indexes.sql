@@ -0,0 +1,17 @@
+-- Indexes backing the rule management and dashboard queries.
+-- Mirrors the __table_args__ declared on the ORM models in app/models.py.
+
+-- list_rules_for_column filters on connection, table and column together
+CREATE INDEX IF NOT EXISTS ix_column_rules_conn_table_col
+  ON column_rules (db_connection_id, table_name, column_name);
+
+-- Rule lookups by name (get_column_rule_by_name)
+CREATE INDEX IF NOT EXISTS ix_column_rules_rule_name
+  ON column_rules (rule_name);
+
+-- Dashboard KPIs/trends/top violations join results to rules and filter by detection time
+CREATE INDEX IF NOT EXISTS ix_rule_results_rule_id_detected_at
+  ON rule_results (rule_id, detected_at);
+
+CREATE INDEX IF NOT EXISTS ix_rule_results_detected_at
+  ON rule_results (detected_at);
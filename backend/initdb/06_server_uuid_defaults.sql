@@ -0,0 +1,9 @@
+-- Generate primary keys with the built-in gen_random_uuid() (PostgreSQL 13+).
+-- The ORM models rely on these server-side defaults instead of creating UUIDs in
+-- Python, so INSERTs omit the id and read it back with RETURNING.
+
+ALTER TABLE db_connections ALTER COLUMN id SET DEFAULT gen_random_uuid();
+ALTER TABLE column_rules ALTER COLUMN id SET DEFAULT gen_random_uuid();
+ALTER TABLE rule_results ALTER COLUMN id SET DEFAULT gen_random_uuid();
+ALTER TABLE rule_runs ALTER COLUMN id SET DEFAULT gen_random_uuid();
+ALTER TABLE violations ALTER COLUMN id SET DEFAULT gen_random_uuid();
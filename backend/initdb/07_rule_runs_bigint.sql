@@ -0,0 +1,7 @@
+-- Widen the rule run metrics to BIGINT so row counts of large tables do not
+-- overflow INTEGER. Matches the BigInteger columns of the RuleRun ORM model.
+
+ALTER TABLE rule_runs
+  ALTER COLUMN duration_ms TYPE BIGINT,
+  ALTER COLUMN checked_rows TYPE BIGINT,
+  ALTER COLUMN failed_rows TYPE BIGINT;
@@ -0,0 +1,5 @@
+-- Index backing the worker's due-rule selection (worker.check_rules), which
+-- filters active rules and resolves their interval names.
+-- Mirrors the __table_args__ declared on ColumnRule in app/models.py.
+CREATE INDEX IF NOT EXISTS ix_column_rules_interval_active
+  ON column_rules (interval, active);
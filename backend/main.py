@@ -15,11 +15,21 @@ Key Features:
 Intended for use with a frontend (e.g., React) and an LLM microservice.
 """
 import os
+import asyncio
+import hashlib
+import threading
+from contextlib import asynccontextmanager
+import anyio.to_thread
 import httpx
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Header
+import msgpack
+import orjson
+from cachetools import LRUCache, TTLCache
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 import datetime
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -38,7 +48,7 @@ from app.crud import (
 # Models & CRUD aus dem Unterpaket backend.app
 from app.models import DBConnection, ColumnRule
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_db, probe_database, DB_POOL_SIZE, DB_MAX_OVERFLOW
 from app.schemas import ConnectionTestRequest, ConnectionTestResponse
 from app.schemas import (
     DashboardKPI,
@@ -55,7 +65,77 @@ def require_api_key(x_api_key: str | None = Header(None)):
     if API_KEY and x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
-app = FastAPI(dependencies=[Depends(require_api_key)])
+# Synchronous endpoints run in AnyIO's worker threadpool (40 threads by default).
+# Sizing it to the database pool lets every pooled connection serve a request
+# concurrently instead of requests queueing for a thread.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+# Shared HTTP client for calls to the LLM microservice. It is created on startup
+# so that keep-alive connections are reused across chat messages.
+http_client: httpx.AsyncClient | None = None
+
+# Backoff bounds (seconds) for the startup database probe
+DB_PROBE_INITIAL_DELAY = 0.5
+DB_PROBE_MAX_DELAY = 10.0
+
+async def wait_for_database(app: FastAPI):
+    """
+    Probe the database in the background until it accepts connections.
+
+    Runs the blocking psycopg2 probe in the default executor with exponential
+    backoff, so uvicorn binds its socket and serves ``/healthz`` (503 until the
+    database is up) while Postgres is still starting.
+
+    Args:
+        app (FastAPI): Application whose ``state.db_ready`` flag is set once
+            the database is reachable.
+    """
+    loop = asyncio.get_running_loop()
+    delay = DB_PROBE_INITIAL_DELAY
+    while True:
+        try:
+            await loop.run_in_executor(None, probe_database)
+        except Exception as exc:
+            logger.warning("Database not reachable yet (%s), retrying in %.1fs", exc, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DB_PROBE_MAX_DELAY)
+        else:
+            app.state.db_ready = True
+            logger.info("Database is reachable")
+            return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    global http_client
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    http_client = httpx.AsyncClient(
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
+    app.state.db_ready = False
+    db_probe = asyncio.create_task(wait_for_database(app))
+    try:
+        yield
+    finally:
+        db_probe.cancel()
+        dispose_remote_engines()
+        await http_client.aclose()
+        http_client = None
+
+app = FastAPI(dependencies=[Depends(require_api_key)], lifespan=lifespan)
+
+async def healthz(request: Request) -> Response:
+    """
+    Readiness endpoint: 200 once the database is reachable, 503 before.
+
+    Registered as a plain Starlette route so that probes do not need the API key.
+    """
+    if getattr(request.app.state, "db_ready", False):
+        return Response(b'{"status":"ok"}', media_type="application/json")
+    return Response(b'{"status":"starting"}', status_code=503, media_type="application/json")
+
+app.add_route("/healthz", healthz, methods=["GET"])
 
 # Enable CORS to allow the frontend (e.g. React) to communicate with this API.
 origins_env = os.getenv("CORS_ORIGINS", "*")
@@ -64,14 +144,151 @@ if origins_env == "*":
 else:
     origins = [o.strip() for o in origins_env.split(",") if o.strip()]
 
+# Explicit method/header allowlists let CORSMiddleware answer preflights with
+# set lookups instead of echoing back whatever the browser requested.
+CORS_ALLOW_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+# Headers sent by the frontend, plus the optional API key header
+CORS_ALLOW_HEADERS = ["authorization", "content-type", "accept", "x-api-key"]
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
 )
 
+class _RemoteEngineCache(LRUCache):
+    """LRU cache of remote engines that disposes the engines it evicts."""
+
+    def popitem(self):
+        key, engine = super().popitem()
+        # Close the evicted engine's pooled connections instead of leaving them open
+        engine.dispose()
+        return key, engine
+
+# Pooled engines of saved external database connections, keyed by connection string
+_remote_engines = _RemoteEngineCache(maxsize=64)
+_remote_engines_lock = threading.Lock()
+
+def remote_connect_args(conn_str: str) -> dict:
+    """
+    Return the DBAPI connect arguments used for external databases.
+
+    Only libpq based drivers understand ``connect_timeout``; other dialects get
+    no extra arguments.
+
+    Args:
+        conn_str (str): SQLAlchemy connection string of the external database.
+
+    Returns:
+        dict: Keyword arguments for ``create_engine(connect_args=...)``.
+    """
+    from sqlalchemy.engine import make_url
+
+    if make_url(conn_str).get_backend_name() == "postgresql":
+        return {"connect_timeout": 5}
+    return {}
+
+def get_remote_engine(conn_str: str) -> Engine:
+    """
+    Return a pooled engine for a saved external database, creating it on first use.
+
+    Engines are cached per connection string so that repeated inspection
+    requests reuse the same connection pool instead of paying for a new pool
+    and a fresh handshake on every call. At most 64 engines are kept; the
+    least recently used one is disposed when another is added. Only use this
+    for connection strings stored in ``db_connections``; unsaved strings would
+    each keep a pool open (see ``test_connection``).
+
+    Args:
+        conn_str (str): SQLAlchemy connection string of the external database.
+
+    Returns:
+        Engine: The cached SQLAlchemy engine for ``conn_str``.
+    """
+    with _remote_engines_lock:
+        engine = _remote_engines.get(conn_str)
+        if engine is None:
+            # Imported on first use: only the connection-test and inspection endpoints need it
+            from sqlalchemy import create_engine
+            from sqlalchemy.engine import make_url
+
+            # SQLite relies on its own pool classes, which do not accept the
+            # QueuePool sizing arguments (as in app.database)
+            if make_url(conn_str).get_backend_name() == "sqlite":
+                pool_options = {}
+            else:
+                pool_options = {"pool_size": 5, "max_overflow": 5}
+            engine = create_engine(
+                conn_str,
+                pool_pre_ping=True,
+                pool_recycle=1800,
+                connect_args=remote_connect_args(conn_str),
+                **pool_options,
+            )
+            _remote_engines[conn_str] = engine
+        return engine
+
+def dispose_remote_engines() -> None:
+    """Close the pooled connections of all cached remote engines and forget them."""
+    with _remote_engines_lock:
+        engines = list(_remote_engines.values())
+        # clear() does not go through popitem(), so dispose explicitly below
+        _remote_engines.clear()
+    for engine in engines:
+        engine.dispose()
+
+# Table and column names of external databases change rarely, so inspection
+# results are cached per (connection_id, table_name) for SCHEMA_CACHE_TTL seconds;
+# table_name is None for the list of tables. POST .../refresh-schema clears the
+# entries of a connection immediately.
+SCHEMA_CACHE_TTL = int(os.getenv("SCHEMA_CACHE_TTL", "300"))
+_schema_cache = TTLCache(maxsize=512, ttl=SCHEMA_CACHE_TTL)
+_schema_cache_lock = threading.Lock()
+
+def get_cached_schema(connection_id: UUID, table_name: str | None = None) -> list[str] | None:
+    """Return cached table or column names, or None on a cache miss."""
+    with _schema_cache_lock:
+        return _schema_cache.get((connection_id, table_name))
+
+def set_cached_schema(connection_id: UUID, table_name: str | None, names: list[str]) -> list[str]:
+    """Store table or column names in the schema cache and return them."""
+    with _schema_cache_lock:
+        _schema_cache[(connection_id, table_name)] = names
+    return names
+
+def invalidate_schema_cache(connection_id: UUID) -> None:
+    """Drop all cached table and column names of a connection."""
+    with _schema_cache_lock:
+        for key in [k for k in _schema_cache.keys() if k[0] == connection_id]:
+            _schema_cache.pop(key, None)
+
+def etag_json_response(request: Request, body: bytes) -> Response:
+    """
+    Return a JSON response carrying an ETag, or 304 if the client has it already.
+
+    The ETag is a short blake2b digest of the encoded body. Clients that send a
+    matching ``If-None-Match`` header get an empty 304 Not Modified response.
+
+    Args:
+        request (Request): Incoming request, inspected for ``If-None-Match``.
+        body (bytes): Encoded JSON body of the response.
+
+    Returns:
+        Response: 200 with the body, or 304 without it.
+    """
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+    # no-cache: clients may store the body but must revalidate it on each use
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison as in RFC 9110: ignore W/ prefixes, accept lists and "*"
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 # URL of the external LLM (language model) microservice.
 LLM_SERVICE_URL = os.getenv("LLM_SERVICE_URL", "http://llm_service:9000/ask")
 
@@ -85,10 +302,9 @@ async def query_llm(prompt: str) -> str:
     Returns:
         str: The response from the LLM microservice.
     """
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(LLM_SERVICE_URL, json={"prompt": prompt})
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await http_client.post(LLM_SERVICE_URL, json={"prompt": prompt})
+    resp.raise_for_status()
+    data = resp.json()
     return data.get("response", "")
 
 @app.post("/api/test-connection", response_model=ConnectionTestResponse)
@@ -103,27 +319,42 @@ def test_connection(req: ConnectionTestRequest):
         ConnectionTestResponse: Indicates if the connection was successful.
     """
     try:
-        # Attempt to create an engine and connect to the database with a timeout.
-        engine = create_engine(req.connection_string, connect_args={"connect_timeout": 5})
-        conn = engine.connect()
-        conn.close()
+        # The string may never be saved, so it gets a throwaway engine without
+        # a pool (not a cached one): the connection is closed right away
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        engine = create_engine(
+            req.connection_string,
+            poolclass=NullPool,
+            connect_args=remote_connect_args(req.connection_string),
+        )
+        try:
+            conn = engine.connect()
+            conn.close()
+        finally:
+            engine.dispose()
         return ConnectionTestResponse(success=True, detail="Connection successful")
     except Exception as e:
         # Raise an HTTP error if the connection could not be established.
         raise HTTPException(status_code=400, detail=str(e))
 
+_connections_adapter = TypeAdapter(list[schemas.DBConnectionRead])
+
 @app.get("/api/db-connections", response_model=list[schemas.DBConnectionRead])
-def list_connections(db: Session = Depends(get_db)):
+def list_connections(request: Request, db: Session = Depends(get_db)):
     """
     List all configured database connections.
 
     Args:
+        request (Request): Incoming request, used for ETag revalidation.
         db (Session): Database session dependency.
 
     Returns:
         List[DBConnectionRead]: List of saved database connections.
     """
-    return crud.get_db_connections(db)
+    connections = _connections_adapter.validate_python(crud.get_db_connections(db), from_attributes=True)
+    return etag_json_response(request, _connections_adapter.dump_json(connections))
 
 @app.post("/api/db-connections", response_model=schemas.DBConnectionRead)
 def add_connection(payload: schemas.DBConnectionCreate, db: Session = Depends(get_db)):
@@ -150,53 +381,85 @@ def delete_connection(connection_id: UUID, db: Session = Depends(get_db)):
     """
     if not crud.delete_db_connection(db, connection_id):
         raise HTTPException(status_code=404, detail="Connection not found")
+    invalidate_schema_cache(connection_id)
+
+@app.post("/api/db-connections/{connection_id}/refresh-schema", status_code=204)
+def refresh_schema(connection_id: UUID):
+    """
+    Discard cached table and column names of a database connection.
+
+    The next request to the tables or columns endpoints inspects the external
+    database again.
+
+    Args:
+        connection_id (UUID): The ID of the connection to refresh.
+    """
+    invalidate_schema_cache(connection_id)
 
 @app.get("/api/db-connections/{connection_id}/tables", response_model=list[str])
-def list_tables(connection_id: UUID, db: Session = Depends(get_db)):
+def list_tables(connection_id: UUID, request: Request, db: Session = Depends(get_db)):
     """
     List all table names for a given database connection.
 
     Args:
         connection_id (UUID): ID of the database connection.
+        request (Request): Incoming request, used for ETag revalidation.
         db (Session): Database session dependency.
 
     Returns:
         List[str]: List of table names.
     """
+    tables = get_cached_schema(connection_id)
+    if tables is None:
+        tables = load_table_names(connection_id, db)
+    return etag_json_response(request, orjson.dumps(tables))
+
+def load_table_names(connection_id: UUID, db: Session) -> list[str]:
+    """Inspect the external database of a connection and cache its table names."""
     # Look up the DBConnection object by ID
-    conn_obj = db.query(DBConnection).filter(DBConnection.id == connection_id).first()
+    conn_obj = db.get(DBConnection, connection_id)
     if not conn_obj:
         raise HTTPException(status_code=404, detail="Connection not found")
-    # Create an SQLAlchemy engine for this connection string
-    engine = create_engine(conn_obj.connection_string)
-    # Use SQLAlchemy inspector to list tables
+    # Reuse the cached engine for this connection string
+    engine = get_remote_engine(conn_obj.connection_string)
+    # Use SQLAlchemy inspector to list tables (reflection is imported on first use)
+    from sqlalchemy import inspect
     inspector = inspect(engine)
-    return inspector.get_table_names()
+    return set_cached_schema(connection_id, None, inspector.get_table_names())
 
 @app.get("/api/db-connections/{connection_id}/tables/{table_name}/columns", response_model=List[str])
-def list_table_columns(connection_id: UUID, table_name: str, db: Session = Depends(get_db)):
+def list_table_columns(connection_id: UUID, table_name: str, request: Request, db: Session = Depends(get_db)):
     """
     List all column names for a specific table in a given database connection.
 
     Args:
         connection_id (UUID): ID of the database connection.
         table_name (str): Name of the table.
+        request (Request): Incoming request, used for ETag revalidation.
         db (Session): Database session dependency.
 
     Returns:
         List[str]: List of column names.
     """
+    columns = get_cached_schema(connection_id, table_name)
+    if columns is None:
+        columns = load_column_names(connection_id, table_name, db)
+    return etag_json_response(request, orjson.dumps(columns))
+
+def load_column_names(connection_id: UUID, table_name: str, db: Session) -> list[str]:
+    """Inspect a table of a connection's external database and cache its column names."""
     # Retrieve the connection record
-    conn_obj = db.query(DBConnection).filter(DBConnection.id == connection_id).first()
+    conn_obj = db.get(DBConnection, connection_id)
     if not conn_obj:
         raise HTTPException(status_code=404, detail="Connection not found")
-    # Create engine and inspector for the target database
-    engine = create_engine(conn_obj.connection_string)
+    # Reuse the cached engine and create an inspector for the target database
+    engine = get_remote_engine(conn_obj.connection_string)
+    from sqlalchemy import inspect
     inspector = inspect(engine)
     # Fetch column information for the specified table
     cols_info = inspector.get_columns(table_name)
-    # Extract and return the column names
-    return [col["name"] for col in cols_info]
+    # Extract, cache and return the column names
+    return set_cached_schema(connection_id, table_name, [col["name"] for col in cols_info])
 
 @app.post(
     "/api/db-connections/{connection_id}/tables/{table_name}/columns/{column_name}/rules",
@@ -223,8 +486,7 @@ def add_rule_to_column(
         ColumnRuleRead: The created column rule.
     """
     # Ensure the database connection exists
-    db_conn = db.query(DBConnection).filter(DBConnection.id == connection_id).first()
-    if not db_conn:
+    if not crud.db_connection_exists(db, connection_id):
         raise HTTPException(status_code=404, detail="Database connection not found")
 
     # Create and return the new column rule using CRUD helper
@@ -262,9 +524,8 @@ def list_rules_for_column(
     Returns:
         List[ColumnRuleRead]: List of rules for the column.
     """
-    # Retrieve the connection record
-    db_conn = db.query(DBConnection).filter(DBConnection.id == connection_id).first()
-    if not db_conn:
+    # Ensure the database connection exists
+    if not crud.db_connection_exists(db, connection_id):
         raise HTTPException(status_code=404, detail="Database connection not found")
     # Query all rules for this column in the ColumnRule table
     rules = db.query(ColumnRule).filter_by(
@@ -302,9 +563,8 @@ def update_rule(
     Returns:
         ColumnRuleRead: The updated rule.
     """
-    # Retrieve the connection record to ensure it exists
-    db_conn = db.query(DBConnection).filter(DBConnection.id == connection_id).first()
-    if not db_conn:
+    # Ensure the database connection exists
+    if not crud.db_connection_exists(db, connection_id):
         raise HTTPException(status_code=404, detail="Database connection not found")
     # Update and return the rule using CRUD helper
     rule = crud.update_column_rule(db, rule_id, updated.rule_name, updated.rule_text, updated.description, updated.severity)
@@ -334,9 +594,9 @@ def get_rule_by_name(rule_name: str, db: Session = Depends(get_db)):
 
 
 @app.get("/api/db-connections/{connection_id}/rules", response_model=List[str])
-def list_rule_names(connection_id: UUID, db: Session = Depends(get_db)):
+def list_rule_names(connection_id: UUID, request: Request, db: Session = Depends(get_db)):
     """Return all rule names for a given connection."""
-    return crud.get_rule_names(db, connection_id)
+    return etag_json_response(request, orjson.dumps(crud.get_rule_names(db, connection_id)))
 
 @app.get("/api/dashboard/kpis", response_model=DashboardKPI)
 def dashboard_kpis(
@@ -402,6 +662,11 @@ def dashboard_top_violations(
     return get_dashboard_top_violations(db, db_conn_id, date_from, date_to)
 
 
+# Upper bound for the page size of /api/dashboard/results
+MAX_RESULTS_LIMIT = 1000
+# Flush the streamed body once this many bytes are buffered
+STREAM_CHUNK_SIZE = 64 * 1024
+
 @app.get("/api/dashboard/results", response_model=DashboardResultPage)
 def dashboard_results(
     db_conn_id: UUID = Query(..., alias="db_conn_id"),
@@ -412,8 +677,36 @@ def dashboard_results(
     rules: List[str] | None = Query(None),
     db: Session = Depends(get_db),
 ):
-    """Return recent rule results for a connection."""
-    return get_dashboard_results(db, db_conn_id, date_from, date_to, limit, rules, offset)
+    """
+    Return recent rule results for a connection.
+
+    The page is streamed: rows come from a server-side cursor and are encoded
+    with orjson as they arrive, so memory stays bounded regardless of
+    ``limit`` (capped at ``MAX_RESULTS_LIMIT``). The rows are trusted database
+    data and are not re-validated against ``DashboardResultPage``;
+    ``response_model`` is kept for the OpenAPI schema.
+    """
+    limit = min(limit, MAX_RESULTS_LIMIT)
+    page = get_dashboard_results(db, db_conn_id, date_from, date_to, limit, rules, offset)
+
+    def stream():
+        buf = bytearray(b'{"total":%d,"items":[' % page["total"])
+        for i, item in enumerate(page["items"]):
+            if i:
+                buf += b","
+            # OPT_UTC_Z matches Pydantic's "Z" suffix for UTC timestamps
+            buf += orjson.dumps(item, option=orjson.OPT_UTC_Z)
+            if len(buf) >= STREAM_CHUNK_SIZE:
+                yield bytes(buf)
+                buf.clear()
+        buf += b"]}"
+        yield bytes(buf)
+
+    # The get_db session stays open until the response has been sent
+    return StreamingResponse(stream(), media_type="application/json")
+
+# WebSocket subprotocol for clients that exchange msgpack-encoded binary frames
+MSGPACK_SUBPROTOCOL = "msgpack"
 
 @app.websocket("/ws/chat")
 async def chat_ws(websocket: WebSocket):
@@ -423,19 +716,29 @@ async def chat_ws(websocket: WebSocket):
     Forwards each client message to the LLM microservice and sends the LLM's response back to the client.
     This enables real-time conversational AI for the frontend.
 
+    Clients that offer the ``msgpack`` subprotocol exchange msgpack-encoded
+    binary frames; all other clients keep using JSON text frames.
+
     Args:
         websocket (WebSocket): The WebSocket connection.
     """
-    await websocket.accept()
+    use_msgpack = MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+    await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL if use_msgpack else None)
     try:
         while True:
-            # Receive JSON data from the client (expects a "message" field)
-            data = await websocket.receive_json()
+            # Receive the client payload (expects a "message" field)
+            if use_msgpack:
+                data = msgpack.unpackb(await websocket.receive_bytes(), raw=False)
+            else:
+                data = await websocket.receive_json()
             user_msg = data.get("message", "")
             # Forward the user's message to the external LLM microservice and await response
             bot_reply = await query_llm(user_msg)
-            # Send the LLM's reply back to the client
-            await websocket.send_json({"response": bot_reply})
+            # Send the LLM's reply back to the client in the negotiated encoding
+            if use_msgpack:
+                await websocket.send_bytes(msgpack.packb({"response": bot_reply}))
+            else:
+                await websocket.send_json({"response": bot_reply})
     except WebSocketDisconnect:
         # Handle client disconnects gracefully
-        print("Client disconnected")
\ No newline at end of file
+        logger.info("Chat client disconnected")
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Shared pytest configuration for the backend test suite."""
+
+import os
+import sys
+
+import pytest
+
+# Make the backend package (``app``) and the repository root (``worker``)
+# importable from every test module, regardless of collection order or the
+# directory pytest is started from. Test modules must not touch sys.path.
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, _BACKEND_DIR)
+sys.path.append(os.path.dirname(_BACKEND_DIR))
+
+# The backend tests mock the database session. Point app.database at an
+# in-memory SQLite URL once, before any app module is imported, so importing it
+# neither probes Postgres nor builds a real connection pool; SQLite engines
+# connect lazily and nothing here asks for a connection.
+os.environ["DATABASE_URL"] = "sqlite://"
+# Never create tables on import during tests
+os.environ.pop("RUN_DB_INIT", None)
+
+
+def _mock_chain(root, path):
+    """
+    Return the mock reached by calling each attribute of a dotted path in turn.
+
+    ``_mock_chain(db, "query.join.filter")`` is the mock returned by
+    ``db.query(...).join(...).filter(...)``, i.e. the same object as
+    ``db.query.return_value.join.return_value.filter.return_value``.
+    """
+    node = root
+    for name in path.split("."):
+        node = getattr(node, name).return_value
+    return node
+
+
+@pytest.fixture(scope="session")
+def mock_chain():
+    """Helper for configuring chained SQLAlchemy query mocks (see ``_mock_chain``)."""
+    return _mock_chain
+
+
+def pytest_configure(config):
+    # SQLAlchemy warnings (e.g. statements that cannot be cached) fail the tests
+    config.addinivalue_line("filterwarnings", "error::sqlalchemy.exc.SAWarning")
+
+
+def _assert_calls(mock, *expected):
+    """
+    Assert the complete, ordered list of calls recorded on ``mock`` in one go.
+
+    ``expected`` are ``unittest.mock.call`` objects, e.g.
+    ``call.query(Model), call.query().filter(ANY), call.query().filter().first()``.
+    The recorded calls are compared on the left so that ``ANY`` placeholders, not
+    SQLAlchemy expressions, decide equality.
+    """
+    assert mock.mock_calls == list(expected)
+
+
+@pytest.fixture(scope="session")
+def assert_calls():
+    """Helper for asserting all calls made on a mock at once (see ``_assert_calls``)."""
+    return _assert_calls
@@ -2,37 +2,58 @@
 
 import importlib
 import sys
+from datetime import date
 from unittest.mock import MagicMock
-import runpy
 import uuid
 import types
 
 import pytest
 
+from app import crud
+
+# Fixed connection id and date for the dashboard tests; any values will do for the mocks
+_CONN_ID = uuid.UUID(int=1)
+_TODAY = date(2024, 1, 1)
+
 # We will test database module initialization and generator
 
-def test_database_wait_for_postgres(monkeypatch):
-    # Prepare mock engine with connect behavior
+@pytest.fixture(scope="session")
+def patched_database():
+    """Import a fresh ``app.database`` once, against a mocked engine and a Postgres URL."""
+    def no_connect(**kwargs):
+        raise AssertionError("app.database connected to the database at import")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATABASE_URL', 'postgresql://u:p@dbhost:5433/valiax')
+        mp.setattr('psycopg2.connect', no_connect)
+        mp.setattr('sqlalchemy.create_engine', lambda *a, **k: MagicMock())
+        mp.setattr('sqlalchemy.ext.declarative.declarative_base', lambda: MagicMock(metadata=MagicMock(create_all=MagicMock())))
+        mp.setattr('time.sleep', lambda s: None)
+        sys.modules.pop('app.database', None)
+        module = importlib.import_module('app.database')
+    return module
+
+
+def test_database_wait_for_postgres(patched_database, monkeypatch):
+    # Probe with psycopg2 directly: fail once, then succeed
     connect_calls = []
-    mock_conn = MagicMock()
-    mock_conn.__enter__.return_value = mock_conn
-    mock_conn.__exit__.return_value = None
-    def connect():
-        connect_calls.append(True)
+    def connect(**kwargs):
+        connect_calls.append(kwargs)
         if len(connect_calls) == 1:
-            from sqlalchemy.exc import OperationalError
-            raise OperationalError('x','y','z')
-        return mock_conn
-    mock_engine = MagicMock(connect=MagicMock(side_effect=connect))
+            import psycopg2
+            raise psycopg2.OperationalError('not ready')
+        return MagicMock()
 
-    monkeypatch.setattr('sqlalchemy.create_engine', lambda *a, **k: mock_engine)
-    monkeypatch.setattr('sqlalchemy.ext.declarative.declarative_base', lambda: MagicMock(metadata=MagicMock(create_all=MagicMock())))
+    monkeypatch.setattr('psycopg2.connect', connect)
     monkeypatch.setattr('time.sleep', lambda s: None)
+    db = patched_database
 
-    sys.modules.pop('app.database', None)
-    db = importlib.import_module('app.database')
-
+    db.wait_for_postgres()
     assert len(connect_calls) == 2
+    assert connect_calls[-1] == {
+        'user': 'u', 'password': 'p', 'host': 'dbhost', 'port': 5433,
+        'dbname': 'valiax', 'connect_timeout': 2,
+    }
     # Test get_db generator
     session = MagicMock()
     db.SessionLocal = MagicMock(return_value=session)
@@ -43,50 +64,44 @@ def test_database_wait_for_postgres(monkeypatch):
     session.close.assert_called_once()
 
 
-def test_get_dashboard_kpis_zero(monkeypatch):
-    from app import crud
+def test_get_dashboard_kpis_zero(monkeypatch, mock_chain):
     db = MagicMock()
-    db.query.return_value.join.return_value.filter.return_value.scalar.side_effect = [5, 2, 1, 0]
-    result = crud.get_dashboard_kpis(db, uuid.uuid4())
+    mock_chain(db, "query.join.filter").scalar.side_effect = [5, 2, 1, 0]
+    result = crud.get_dashboard_kpis(db, _CONN_ID)
     assert result['total_violations'] == 5
     assert result['critical_violations'] == 2
     assert result['affected_tables'] == 1
     assert result['compliance_rate'] == 1.0
 
 
-def test_get_dashboard_trends_with_range():
-    from app import crud
-    from datetime import date
+def test_get_dashboard_trends_with_range(mock_chain):
     db = MagicMock()
-    mock_row = MagicMock(date=types.SimpleNamespace(isoformat=lambda: 'd'), rule_name='R', count=1)
-    db.query.return_value.join.return_value.filter.return_value.filter.return_value.filter.return_value.group_by.return_value.order_by.return_value.all.return_value = [mock_row]
-    res = crud.get_dashboard_trends(db, uuid.uuid4(), date_from=date.today(), date_to=date.today())
+    mock_row = types.SimpleNamespace(date=types.SimpleNamespace(isoformat=lambda: 'd'), rule_name='R', count=1)
+    mock_chain(db, "query.join.filter.filter.filter.group_by.order_by").all.return_value = [mock_row]
+    res = crud.get_dashboard_trends(db, _CONN_ID, date_from=_TODAY, date_to=_TODAY)
     assert res == [{'date': 'd', 'rule_name': 'R', 'count': 1}]
 
 
-def test_get_dashboard_top_violations_with_range():
-    from app import crud
-    from datetime import date
+def test_get_dashboard_top_violations_with_range(mock_chain):
     db = MagicMock()
-    mock_rule = MagicMock(rule_name='R', count=2)
-    mock_table = MagicMock(table_name='T', count=3)
+    mock_rule = types.SimpleNamespace(rule_name='R', count=2)
+    mock_table = types.SimpleNamespace(table_name='T', count=3)
     # chain for top_rules
-    db.query.return_value.join.return_value.filter.return_value.filter.return_value.filter.return_value.group_by.return_value.order_by.return_value.limit.return_value.all.side_effect = [[mock_rule], [mock_table]]
-    res = crud.get_dashboard_top_violations(db, uuid.uuid4(), date_from=date.today(), date_to=date.today())
+    mock_chain(db, "query.join.filter.filter.filter.group_by.order_by.limit").all.side_effect = [[mock_rule], [mock_table]]
+    res = crud.get_dashboard_top_violations(db, _CONN_ID, date_from=_TODAY, date_to=_TODAY)
     assert res['top_rules'][0]['rule_name'] == 'R'
     assert res['top_tables'][0]['table_name'] == 'T'
 
 
-def test_runfile_executes_main(monkeypatch):
-    called = {'yes': False}
-    monkeypatch.setattr('unittest.main', lambda: called.__setitem__('yes', True))
-    path = 'backend/tests/test_models_schemas_mocked.py'
-    with open(path) as f:
-        code = compile(f.read(), path, 'exec')
-        exec(code, {'__name__': '__main__'})
+def test_cli_entry_points(monkeypatch):
+    # The modules are already imported by collection; only their script entry points are exercised
+    test_models_schemas_mocked = importlib.import_module('test_models_schemas_mocked')
+    test_crud = importlib.import_module('test_crud')
+    called = {'unittest': False, 'pytest': False}
+    monkeypatch.setattr('unittest.main', lambda: called.__setitem__('unittest', True))
+    monkeypatch.setattr('pytest.main', lambda args: called.__setitem__('pytest', True))
 
-    path2 = 'backend/tests/test_crud.py'
-    with open(path2) as f:
-        code2 = compile(f.read(), path2, 'exec')
-        exec(code2, {'__name__': '__main__', '__file__': path2})
-    assert called['yes']
+    test_models_schemas_mocked._cli()
+    test_crud._cli()
+    assert called['unittest']
+    assert called['pytest']
@@ -0,0 +1,46 @@
+import os
+import sys
+import types
+import importlib.util
+from unittest.mock import MagicMock
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def load_llm(monkeypatch, kv_cache_type=None):
+    """Import llm_service/llm.py against a stub llama_cpp (no model is loaded)."""
+    # Only the constants llama-cpp-python actually provides
+    stub = types.ModuleType("llama_cpp")
+    stub.GGML_TYPE_F16 = 1
+    stub.GGML_TYPE_Q8_0 = 8
+    stub.Llama = MagicMock()
+    monkeypatch.setitem(sys.modules, "llama_cpp", stub)
+    if kv_cache_type is None:
+        monkeypatch.delenv("LLM_KV_CACHE_TYPE", raising=False)
+    else:
+        monkeypatch.setenv("LLM_KV_CACHE_TYPE", kv_cache_type)
+    spec = importlib.util.spec_from_file_location("llm_service_llm", os.path.join(ROOT, "llm_service", "llm.py"))
+    llm = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(llm)
+    return llm, stub.Llama
+
+
+def test_llm_imports_with_default_kv_cache(monkeypatch):
+    llm, llama = load_llm(monkeypatch)
+    kwargs = llama.call_args.kwargs
+    assert kwargs["type_k"] == kwargs["type_v"] == 1
+    assert kwargs["flash_attn"] is False
+
+
+def test_quantized_kv_cache_enables_flash_attention(monkeypatch):
+    llm, llama = load_llm(monkeypatch, "q8_0")
+    kwargs = llama.call_args.kwargs
+    assert kwargs["type_k"] == kwargs["type_v"] == 8
+    assert kwargs["flash_attn"] is True
+
+
+def test_unknown_kv_cache_type_is_rejected(monkeypatch):
+    with pytest.raises(KeyError):
+        load_llm(monkeypatch, "bf16")
@@ -1,34 +1,48 @@
 import uuid
 import datetime
-import sys, os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 from worker import worker
 
 class DummyCursor:
     def __init__(self, rows):
         self.rows = rows
+        self.executed = []
     def execute(self, sql, params=None):
-        pass
+        self.executed.append((sql, params))
     def fetchall(self):
         return self.rows
     def close(self):
         pass
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
 
 class DummyConn:
     def __init__(self, rows):
         self.c = DummyCursor(rows)
+        self.commits = 0
+        self.closed = False
     def cursor(self):
         return self.c
     def commit(self):
+        self.commits += 1
+    def rollback(self):
         pass
     def close(self):
-        pass
+        self.closed = True
+    # Like psycopg2: the block ends the transaction but keeps the connection open
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, *exc):
+        self.commit() if exc_type is None else self.rollback()
 
 class FakeResp:
+    def __init__(self, rule_ids):
+        self.rule_ids = rule_ids
     def raise_for_status(self):
         pass
     def json(self):
-        return {"ok": True}
+        return {"results": {rule_id: {"result": True} for rule_id in self.rule_ids}}
 
 class FakeDateTime(datetime.datetime):
     _now = datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)
@@ -38,17 +52,83 @@ class FakeDateTime(datetime.datetime):
 
 
 def test_check_rules_only_due(monkeypatch):
-    due = uuid.uuid4()
-    not_due = uuid.uuid4()
-    rows = [
-        (due, 'daily', FakeDateTime._now - datetime.timedelta(days=1, minutes=1)),
-        (not_due, 'daily', FakeDateTime._now)
-    ]
-    conn = DummyConn(rows)
-    monkeypatch.setattr(worker.psycopg2, 'connect', lambda *a, **k: conn)
+    due, db_conn = uuid.uuid4(), uuid.uuid4()
+    # The due filter runs in SQL; the cursor returns only the due rules
+    conn = DummyConn([(due, db_conn)])
+    connects = []
+    monkeypatch.setattr(worker.psycopg2, 'connect', lambda *a, **k: connects.append(a) or conn)
     sent = []
-    monkeypatch.setattr(worker.requests, 'post', lambda *a, **k: sent.append(k['json']['rule_ids'][0]) or FakeResp())
+    monkeypatch.setattr(worker.runner_session, 'post', lambda *a, **k: sent.append(k['json']) or FakeResp(k['json']['rule_ids']))
     monkeypatch.setattr(worker.datetime, 'datetime', FakeDateTime)
+    inserted = []
+    monkeypatch.setattr(worker, 'execute_values', lambda cur, sql, rows, **k: inserted.extend(rows))
 
     worker.check_rules()
-    assert sent == [due]
+    assert sent == [{"db_conn_id": str(db_conn), "rule_ids": [str(due)]}]
+    # All results are written with one batched insert
+    assert [(now, rule_id, result.adapted) for now, rule_id, result in inserted] == [
+        (FakeDateTime._now, due, {"results": {str(due): {"result": True}}})
+    ]
+    due_sql, due_params = conn.c.executed[0]
+    assert "%(now)s" in due_sql
+    assert due_params == {"now": FakeDateTime._now}
+    # One connection for the whole task: read committed, insert committed, closed
+    assert len(connects) == 1 and conn.commits == 2 and conn.closed
+
+
+def test_check_rules_batches_rules_per_connection(monkeypatch):
+    conn_a, conn_b = uuid.uuid4(), uuid.uuid4()
+    a1, a2, b1 = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    conn = DummyConn([(a1, conn_a), (b1, conn_b), (a2, conn_a)])
+    monkeypatch.setattr(worker.psycopg2, 'connect', lambda *a, **k: conn)
+    monkeypatch.setattr(worker, 'RULE_TIMEOUT_SECONDS', 60)
+    sent, timeouts = [], {}
+
+    def post(url, json, timeout):
+        sent.append(json)
+        timeouts[tuple(json['rule_ids'])] = timeout
+        # The runner silently skips rules it cannot find
+        return FakeResp([rule_id for rule_id in json['rule_ids'] if rule_id != str(a2)])
+
+    monkeypatch.setattr(worker.runner_session, 'post', post)
+    inserted = []
+    monkeypatch.setattr(worker, 'execute_values', lambda cur, sql, rows, **k: inserted.extend(rows))
+
+    worker.check_rules()
+    # One request per target connection instead of one per rule
+    assert sorted(sent, key=lambda p: p['rule_ids'][0] != str(a1)) == [
+        {"db_conn_id": str(conn_a), "rule_ids": [str(a1), str(a2)]},
+        {"db_conn_id": str(conn_b), "rule_ids": [str(b1)]},
+    ]
+    # Batches may queue behind each other on the runner, so every request
+    # allows for all rules dispatched in this run
+    margin = worker.RUNNER_TIMEOUT_MARGIN_SECONDS
+    assert timeouts[(str(a1), str(a2))][1] == 3 * 60 + margin
+    assert timeouts[(str(b1),)][1] == 3 * 60 + margin
+    assert {rule_id: result.adapted for _, rule_id, result in inserted} == {
+        a1: {"results": {str(a1): {"result": True}}},
+        a2: {"error": "no result returned by the rule runner"},
+        b1: {"results": {str(b1): {"result": True}}},
+    }
+
+
+def test_check_rules_stores_dispatch_errors(monkeypatch):
+    ok, failing = uuid.uuid4(), uuid.uuid4()
+    conn = DummyConn([(ok, uuid.uuid4()), (failing, uuid.uuid4())])
+    monkeypatch.setattr(worker.psycopg2, 'connect', lambda *a, **k: conn)
+
+    def post(url, json, timeout):
+        if json['rule_ids'] == [str(failing)]:
+            raise worker.requests.ConnectionError("runner unreachable")
+        return FakeResp(json['rule_ids'])
+
+    monkeypatch.setattr(worker.runner_session, 'post', post)
+    inserted = []
+    monkeypatch.setattr(worker, 'execute_values', lambda cur, sql, rows, **k: inserted.extend(rows))
+
+    worker.check_rules()
+    # Results keep the order of the due rules even though requests run in parallel
+    assert [(rule_id, result.adapted) for _, rule_id, result in inserted] == [
+        (ok, {"results": {str(ok): {"result": True}}}),
+        (failing, {"error": "runner unreachable"}),
+    ]
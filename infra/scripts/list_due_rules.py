@@ -1,9 +1,8 @@
 """Utility script for listing all rules that are due for execution."""
 
 import os
-import json
+import orjson
 import psycopg2
-from datetime import datetime, timedelta
 
 # Connection string for the application's metadata database. This must be
 # provided via the ``MAIN_DB_URL`` environment variable when the script runs.
@@ -21,48 +20,52 @@ def get_due_rules():
 
     # Fetch all rules whose next scheduled run time has passed. The query
     # groups rule results by ``rule_id`` to determine the last execution time
-    # and compares it to the rule's configured interval.
+    # and compares it to the rule's configured interval. The interval names are
+    # resolved through an inline lookup table so each row is checked with a
+    # single comparison; LEFT JOIN keeps never-run rules with an unknown interval.
+    # The due rules are then grouped per connection in SQL, so one row comes back
+    # for each connection instead of one per rule.
     cur.execute(
         """
-        SELECT cr.id::text, cr.db_connection_id::text
-        FROM column_rules cr
-        LEFT JOIN (
-            SELECT rule_id, MAX(last_run) AS last_run
-            FROM rule_results
-            GROUP BY rule_id
-        ) rr ON rr.rule_id = cr.id
-        WHERE cr.active = TRUE
-          AND (
-            rr.last_run IS NULL OR
-            (
-              cr.interval = 'minutely' AND rr.last_run <= NOW() - INTERVAL '1 minute'
-            ) OR (
-              cr.interval = 'hourly' AND rr.last_run <= NOW() - INTERVAL '1 hour'
-            ) OR (
-              cr.interval = 'daily' AND rr.last_run <= NOW() - INTERVAL '1 day'
-            ) OR (
-              cr.interval = 'weekly' AND rr.last_run <= NOW() - INTERVAL '7 days'
-            )
-          )
+        WITH due AS (
+            SELECT cr.id::text AS rule_id, cr.db_connection_id::text AS db_conn_id
+            FROM column_rules cr
+            LEFT JOIN (
+                SELECT rule_id, MAX(last_run) AS last_run
+                FROM rule_results
+                GROUP BY rule_id
+            ) rr ON rr.rule_id = cr.id
+            LEFT JOIN (
+                VALUES ('minutely', INTERVAL '1 minute'),
+                       ('hourly', INTERVAL '1 hour'),
+                       ('daily', INTERVAL '1 day'),
+                       ('weekly', INTERVAL '7 days')
+            ) AS iv(name, delta) ON iv.name = cr.interval
+            WHERE cr.active = TRUE
+              AND (rr.last_run IS NULL OR rr.last_run <= NOW() - iv.delta)
+        )
+        SELECT db_conn_id, array_agg(rule_id)
+        FROM due
+        GROUP BY db_conn_id
         """
     )
 
-    rows = cur.fetchall()
-    conn.close()
-
-    groups = {}
-    for rule_id, db_conn_id in rows:
-        groups.setdefault(db_conn_id, []).append(rule_id)
-
+    # psycopg2 returns the text[] aggregate as a Python list
     result = [
         {"db_conn_id": db_conn_id, "rule_ids": rule_ids}
-        for db_conn_id, rule_ids in groups.items()
+        for db_conn_id, rule_ids in cur.fetchall()
     ]
+    conn.close()
+
+    # Encode once and write the bytes as-is; the pretty-printed copy on stdout
+    # is only produced when DEBUG is set
+    payload = orjson.dumps(result)
+    with open("/tmp/output.json", "wb") as f:
+        f.write(payload)
 
-    with open("/tmp/output.json", "w") as f:
+    if os.getenv("DEBUG"):
         print("Generated output.json content:")
-        print(json.dumps(result, indent=2))
-        json.dump(result, f)
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
 
 if __name__ == "__main__":
     get_due_rules()
@@ -1,25 +1,121 @@
 """Minimal wrapper around a locally stored language model."""
 
+import hashlib
 import os
-from ctransformers import AutoModelForCausalLM
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+import llama_cpp
+from llama_cpp import Llama
 
 # Determine the absolute path to the bundled GGUF model file. The container
 # mounts ``/app`` as the working directory, so ``__file__`` points inside that
 # directory.
 base_dir = os.path.dirname(__file__)
-model_path = os.path.join(base_dir, "models", "mistral3b.gguf")
-
-# Load the GGUF model once at import time so subsequent calls are fast. Setting
-# ``local_files_only=True`` avoids any attempt to download the model.
-model = AutoModelForCausalLM.from_pretrained(
-    model_path,
-    model_type="llama",
-    local_files_only=True,
+# The weights are expected in 4-bit Q4_K_M quantization (see models/putmodelshere.txt);
+# decoding is memory-bandwidth bound, so fewer bytes per weight means more tokens/s
+LLM_MODEL_FILE = os.getenv("LLM_MODEL_FILE", "mistral3b.Q4_K_M.gguf")
+model_path = os.path.join(base_dir, "models", LLM_MODEL_FILE)
+
+# Context window and completion length; 256 new tokens matches the previous
+# ctransformers default
+LLM_CONTEXT_LENGTH = int(os.getenv("LLM_CONTEXT_LENGTH", "2048"))
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "256"))
+
+# Element type of the attention KV cache: the default f16, or q8_0 which halves
+# the cache. llama.cpp only accepts a quantized V cache with flash attention,
+# so flash attention is enabled for q8_0.
+KV_CACHE_TYPES = {
+    "f16": llama_cpp.GGML_TYPE_F16,
+    "q8_0": llama_cpp.GGML_TYPE_Q8_0,
+}
+LLM_KV_CACHE_TYPE = KV_CACHE_TYPES[os.getenv("LLM_KV_CACHE_TYPE", "f16")]
+LLM_FLASH_ATTN = LLM_KV_CACHE_TYPE != llama_cpp.GGML_TYPE_F16
+
+# Load the GGUF model once at import time so subsequent calls are fast. The
+# model is read from disk only; llama.cpp runs on the CPU with one thread per
+# core, using the SIMD kernels it was compiled with (see the Dockerfile).
+model = Llama(
+    model_path=model_path,
+    n_ctx=LLM_CONTEXT_LENGTH,
+    n_threads=os.cpu_count(),
+    n_gpu_layers=0,
+    type_k=LLM_KV_CACHE_TYPE,
+    type_v=LLM_KV_CACHE_TYPE,
+    flash_attn=LLM_FLASH_ATTN,
+    verbose=False,
 )
 
+# Responses to recent prompts, keyed by a digest of the prompt and kept in
+# least-recently-used order. Rule authoring tends to resend identical prompts.
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "600"))  # seconds
+_response_cache: "OrderedDict[bytes, tuple[float, str]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _prompt_key(prompt: str) -> bytes:
+    """Return the cache key for ``prompt``."""
+
+    return hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+
+
+def cached_response(prompt: str) -> Optional[str]:
+    """Return the cached response for ``prompt``, or ``None`` if there is no fresh one."""
+
+    key = _prompt_key(prompt)
+    with _cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return response
+
+
+def _store_response(prompt: str, response: str) -> None:
+    """Cache ``response`` for ``prompt``, evicting the least recently used entries."""
+
+    key = _prompt_key(prompt)
+    with _cache_lock:
+        _response_cache[key] = (time.monotonic() + LLM_CACHE_TTL, response)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > LLM_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
 
 def ask_llm(prompt: str) -> str:
-    """Return the model's response for ``prompt``."""
+    """Return the model's response for ``prompt``, reusing a cached one if fresh."""
+
+    response = cached_response(prompt)
+    if response is None:
+        # Invoke the model directly and return the text of the single completion
+        completion = model(prompt, max_tokens=LLM_MAX_TOKENS)
+        response = completion["choices"][0]["text"]
+        _store_response(prompt, response)
+    return response
+
+
+def ask_llm_stream(prompt: str) -> Iterator[str]:
+    """Yield the model's response for ``prompt`` piece by piece as it is generated.
+
+    A cached response is yielded in one piece; a completed generation is cached.
+    """
+
+    response = cached_response(prompt)
+    if response is not None:
+        yield response
+        return
 
-    # Invoke the model directly to produce the completion text
-    return model(prompt)
\ No newline at end of file
+    # With stream=True llama.cpp returns a generator of partial completions
+    pieces = []
+    for chunk in model(prompt, max_tokens=LLM_MAX_TOKENS, stream=True):
+        text = chunk["choices"][0]["text"]
+        pieces.append(text)
+        yield text
+    _store_response(prompt, "".join(pieces))
@@ -1,18 +1,29 @@
 """FastAPI service exposing the local language model over HTTP."""
 
+import asyncio
+
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from llm import ask_llm
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from llm import ask_llm, ask_llm_stream, cached_response
+from pydantic import BaseModel, ConfigDict
 import traceback
 
 class AskRequest(BaseModel):
     """Request body for the ``/ask`` endpoint."""
 
+    # Immutable once parsed; unknown fields are rejected with a 422
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     prompt: str
 
 app = FastAPI(debug=True)
 
+# The llama.cpp model is not thread-safe, so generations run one at a time.
+# Waiting requests queue here without blocking the event loop.
+model_lock = asyncio.Semaphore(1)
+
 # enable CORS for the frontend
 app.add_middleware(
     CORSMiddleware,
@@ -34,10 +45,31 @@ async def ask(request: AskRequest):
     """Return the LLM's response for the provided prompt."""
 
     try:
-        response = ask_llm(request.prompt)
+        # Repeated prompts are answered without queueing for the model
+        response = cached_response(request.prompt)
+        if response is None:
+            # Generate in the threadpool so /health stays responsive meanwhile
+            async with model_lock:
+                response = await run_in_threadpool(ask_llm, request.prompt)
         return {"response": response}
     except Exception as e:
         # Log the full stack trace to aid debugging
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
-    
+
+@app.post("/ask/stream")
+async def ask_stream(request: AskRequest):
+    """Stream the LLM's response for the provided prompt as plain text.
+
+    Text is sent as soon as the model produces it, so clients see the first
+    tokens without waiting for the whole completion. Generation runs in the
+    threadpool to keep the event loop free and waits for ``model_lock``.
+    """
+
+    async def generate():
+        # Hold the model for the whole generation, not just its first chunk
+        async with model_lock:
+            async for text in iterate_in_threadpool(ask_llm_stream(request.prompt)):
+                yield text
+
+    return StreamingResponse(generate(), media_type="text/plain; charset=utf-8")
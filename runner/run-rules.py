@@ -1,26 +1,135 @@
 """HTTP service that executes stored data quality rules in isolation."""
 
 import os
-import json
+import sys
+import ast
+import asyncio
+import hashlib
+import importlib
+import multiprocessing
+import types
 import datetime
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache, partial
+import orjson
 import psycopg2
+from cachetools import TTLCache
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
 import argparse
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s:%(name)s:%(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the main database pool and start the sandbox processes on startup;
+    release pooled resources on shutdown."""
+    main_db_url = os.getenv("MAIN_DB_URL")
+    if main_db_url:
+        try:
+            # Connect before the first request instead of during it
+            await run_in_threadpool(_get_pool, main_db_url)
+        except psycopg2.Error:
+            # Not fatal: /run creates the pool once the database is reachable
+            logger.warning("Main database not reachable on startup", exc_info=True)
+    await run_in_threadpool(warm_up_executor)
+    yield
+    close_pools()
+    shutdown_executor()
+
+app = FastAPI(lifespan=lifespan)
 
 # Comma-separated list of modules allowed to be imported in sandboxed rules
 DEFAULT_ALLOWED_IMPORTS = [m.strip() for m in os.getenv("RUNNER_ALLOWED_IMPORTS", "pandas,datetime,psycopg2").split(",") if m.strip()]
 
+# Upper bound of pooled connections kept open per connection string
+DB_POOL_MAX = int(os.getenv("RUNNER_DB_POOL_MAX", "8"))
+
+# Rules executed at the same time by one /run request; each occupies a
+# sandbox process, so this defaults to the number of CPUs
+MAX_PARALLEL_RULES = int(os.getenv("RUNNER_MAX_PARALLEL_RULES", str(os.cpu_count() or 1)))
+
+# Rows sent per INSERT statement when storing rule results
+RESULTS_PAGE_SIZE = 200
+
+# Rule rows transferred per round trip while streaming them from the database
+FETCH_ITERSIZE = 500
+
+# Connection pools keyed by connection string, shared by all requests. Each
+# pool has a semaphore with one slot per connection: ThreadedConnectionPool
+# raises PoolError instead of waiting when all connections are taken, so
+# callers wait for a slot before borrowing a connection.
+_pools: Dict[str, ThreadedConnectionPool] = {}
+_pool_slots: Dict[str, threading.BoundedSemaphore] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(dsn: str) -> ThreadedConnectionPool:
+    """Return the connection pool for ``dsn``, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(dsn)
+        if pool is None:
+            pool = ThreadedConnectionPool(1, DB_POOL_MAX, dsn)
+            _pools[dsn] = pool
+            _pool_slots[dsn] = threading.BoundedSemaphore(DB_POOL_MAX)
+        return pool
+
+def close_pools() -> None:
+    """Close every pooled connection and forget the pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _pool_slots.clear()
+    for pool in pools:
+        pool.closeall()
+
+@contextmanager
+def pooled_connection(dsn: str):
+    """Borrow a connection to ``dsn`` from its pool for the duration of a block.
+
+    The transaction is committed when the block succeeds and rolled back when
+    it raises; either way the connection goes back to the pool instead of being
+    closed, so later requests skip the connection handshake. When all
+    ``DB_POOL_MAX`` connections are in use, this waits for one to be returned.
+    """
+    pool = _get_pool(dsn)
+    with _pools_lock:
+        slots = _pool_slots[dsn]
+    with slots:
+        conn = pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            # Connections the server dropped are discarded rather than recycled
+            pool.putconn(conn, close=bool(conn.closed))
+
+# Rule definitions change rarely while the worker asks for the same rules every
+# minute, so fetched rows are kept for a short time. Edits to a rule or its
+# connection string take effect after at most RULE_CACHE_TTL seconds.
+RULE_CACHE_TTL = int(os.getenv("RUNNER_RULE_CACHE_TTL", "60"))
+_rule_cache = TTLCache(maxsize=10_000, ttl=RULE_CACHE_TTL)
+_rule_cache_lock = threading.Lock()
+
 def fetch_rules(main_db_url: str, rule_ids: List[str]):
     """Retrieve rule definitions and their target connection strings.
 
+    Rules fetched within the last ``RULE_CACHE_TTL`` seconds are served from
+    memory; only the others are queried. Those rows are streamed from a
+    server-side cursor ``FETCH_ITERSIZE`` at a time, so large batches are never
+    held in memory at once and callers can start working on the first rules
+    while later ones are still being read.
+
     Parameters
     ----------
     main_db_url : str
@@ -28,111 +137,481 @@ def fetch_rules(main_db_url: str, rule_ids: List[str]):
     rule_ids : List[str]
         List of rule UUIDs to fetch.
 
-    Returns
-    -------
-    list[tuple]
-        Tuples of ``(rule_id, rule_text, connection_string)``.
+    Yields
+    ------
+    tuple
+        ``(rule_id, rule_text, connection_string)`` for each rule found.
     """
-    placeholders = ",".join(["%s"] * len(rule_ids))
+    missing = []
+    for rule_id in rule_ids:
+        with _rule_cache_lock:
+            rule = _rule_cache.get(rule_id)
+        if rule is None:
+            missing.append(rule_id)
+        else:
+            yield rule
+    if not missing:
+        return
+
+    placeholders = ",".join(["%s"] * len(missing))
     sql = f"""
         SELECT r.id, r.rule_text, c.connection_string
         FROM column_rules r
         JOIN db_connections c ON r.db_connection_id = c.id
         WHERE r.id IN ({placeholders})
     """
-    with psycopg2.connect(main_db_url) as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, rule_ids)
-            return cur.fetchall()
+    with pooled_connection(main_db_url) as conn:
+        # Named cursors live on the server; they need the transaction that
+        # pooled_connection keeps open until the generator is exhausted
+        with conn.cursor(name="fetch_rules") as cur:
+            cur.itersize = FETCH_ITERSIZE
+            cur.execute(sql, missing)
+            for rule in cur:
+                with _rule_cache_lock:
+                    _rule_cache[str(rule[0])] = rule
+                yield rule
 
-import multiprocessing
+# Maximum run time of a single rule, counted from the moment it starts
+# executing in a sandbox process (time spent waiting for a free process does
+# not count)
+RULE_TIMEOUT_SECONDS = int(os.getenv("RUNNER_RULE_TIMEOUT_SECONDS", "3600"))
+# Extra time a rule gets to react to its timeout before the watchdog first
+# cancels its running query and then kills its sandbox process
+RULE_TIMEOUT_GRACE_SECONDS = int(os.getenv("RUNNER_RULE_TIMEOUT_GRACE_SECONDS", "30"))
 
+# Sandbox processes are kept alive and reused across rules and requests
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
 
-def exec_rule_sandbox(rule_text, target_conn, allowed_imports: Optional[List[str]] = None):
-    """Execute ``rule_text`` as Python code using ``target_conn`` in a restricted
-    sandbox.
+class RuleTimeout(BaseException):
+    """Raised inside a sandbox process when a rule exceeds ``RULE_TIMEOUT_SECONDS``.
 
-    The sandbox runs the rule in a separate process which is terminated after one
-    hour. Imports are currently unrestricted but a list of ``allowed_imports``
-    can be provided in the future to limit which modules may be imported.
-    The executed code should store its result in a variable named ``result`` or
-    provide a callable ``rule`` which returns the result.
+    Derives from ``BaseException`` so that a rule's own ``except Exception``
+    does not swallow it.
     """
 
-    def worker(code, conn, out, imports):
-        # Define a minimal set of safe builtins
-        safe_builtins = {
-            "True": True,
-            "False": False,
-            "None": None,
-            "abs": abs,
-            "min": min,
-            "max": max,
-            "sum": sum,
-            "range": range,
-            "len": len,
-            "int": int,
-            "float": float,
-            "str": str,
-            "bool": bool,
-            "list": list,
-            "dict": dict,
-            "set": set,
-            "tuple": tuple,
-            "Exception": Exception,
-        }
-
-        def checked_import(name, globals=None, locals=None, fromlist=(), level=0):
-            base = name.split(".")[0]
-            if imports is not None and base not in imports:
+def _raise_rule_timeout(signum, frame):
+    """SIGALRM handler of the sandbox processes."""
+    raise RuleTimeout()
+
+# Module namespaces of a sandbox process as they were before its first rule,
+# used to undo changes a rule makes to shared modules (see
+# _restore_module_namespaces); filled in place by _init_sandbox_process
+_module_snapshots: List[tuple] = []
+_MISSING = object()
+
+def _init_sandbox_process(modules: List[str]) -> None:
+    """Prepare a sandbox process: install the timeout handler and preload modules.
+
+    Modules already loaded by this service (pandas, psycopg2) come with the
+    fork; anything else on the allow list is imported here so the first rule
+    that needs it does not pay the import time. Afterwards the namespaces of
+    all loaded modules are snapshotted.
+    """
+    signal.signal(signal.SIGALRM, _raise_rule_timeout)
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            # A rule importing it will fail with the usual error instead
+            logger.warning("Sandbox module %s is not installed", module)
+    _module_snapshots.extend(
+        (module, dict(vars(module)))
+        for module in list(sys.modules.values())
+        if isinstance(module, types.ModuleType)
+    )
+
+def _restore_module_namespaces() -> None:
+    """Undo module-level changes the last rule made to shared modules.
+
+    Sandbox processes run many rules, and all of them share the same module
+    objects (``pd``, ``psycopg2``, ``datetime`` and whatever they import). A
+    rule rebinding a module attribute, e.g. ``pd.DataFrame = None``, would
+    otherwise be seen by every later rule in the process. Rebound and deleted
+    names are put back and added names removed; submodules bound by imports
+    are kept. Comparing the namespaces takes about a millisecond.
+
+    This deliberately does not cover everything a fresh process would: changes
+    to the attributes of classes or other objects (``pd.DataFrame.foo = 1``)
+    and to modules first imported by a rule are not undone. Reusing the
+    processes (preloaded modules, open target connections) is worth that
+    remaining risk for rules, which are written by the service's users rather
+    than untrusted parties.
+    """
+    for module, snapshot in _module_snapshots:
+        namespace = vars(module)
+        try:
+            if namespace == snapshot:
+                continue
+        except Exception:
+            # Values with an unusual __eq__; compare name by name below
+            pass
+        for name in [name for name in namespace if name not in snapshot]:
+            if not isinstance(namespace[name], types.ModuleType):
+                del namespace[name]
+        for name, value in snapshot.items():
+            if namespace.get(name, _MISSING) is not value:
+                namespace[name] = value
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Return the shared sandbox process pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # fork: workers start as copies of this process with pandas & co.
+            # already imported instead of re-importing everything
+            _executor = ProcessPoolExecutor(
+                max_workers=MAX_PARALLEL_RULES,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_sandbox_process,
+                initargs=(DEFAULT_ALLOWED_IMPORTS,),
+            )
+        return _executor
+
+def warm_up_executor() -> None:
+    """Start all sandbox processes now rather than on the first rules."""
+    executor = _get_executor()
+    # Each submission that finds no idle worker starts a new process
+    futures = [executor.submit(int) for _ in range(MAX_PARALLEL_RULES)]
+    for future in futures:
+        future.result()
+
+def _reset_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop the broken pool ``executor`` so the next rule starts a fresh one.
+
+    ``ProcessPoolExecutor`` already terminates the remaining processes of a
+    broken pool; this only forgets it and releases its resources.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_executor() -> None:
+    """Stop the sandbox processes, waiting for rules that are still running."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def validate_rule(rule_text: str, allowed_imports: Optional[List[str]] = None) -> ast.Module:
+    """Parse ``rule_text`` and check its import statements against ``allowed_imports``.
+
+    Rejecting a disallowed ``import`` here means a bad rule fails before any of
+    it runs. ``None`` allows every module.
+
+    Returns
+    -------
+    ast.Module
+        The parsed rule, ready to be compiled.
+
+    Raises
+    ------
+    SyntaxError
+        If ``rule_text`` is not valid Python.
+    ImportError
+        If the rule imports a module outside ``allowed_imports``.
+    """
+    tree = ast.parse(rule_text)
+    if allowed_imports is None:
+        return tree
+    allowed = frozenset(allowed_imports)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            bases = [alias.name.split(".")[0] for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            # Relative imports keep their leading dots and are never allowed
+            bases = ["." * node.level + (node.module or "").split(".")[0]]
+        else:
+            continue
+        for base in bases:
+            if base not in allowed:
                 raise ImportError(f"Import of '{base}' is not allowed")
-            return __import__(name, globals, locals, fromlist, level)
+    return tree
 
-        # Allow all imports if ``imports`` is None
-        safe_builtins["__import__"] = checked_import
+# Compiled rule code is memoized per sandbox process (keyed by the source and
+# the allowed imports), so a rule that runs on every interval is validated,
+# parsed and compiled once; the least recently used entries are evicted first
+CODE_CACHE_SIZE = 1024
 
-        # Locals available to the executed rule
-        local_env = {
-            "target_conn": conn,
-            "pd": pd,
-            "datetime": datetime,
-            "psycopg2": psycopg2,
-        }
+@lru_cache(maxsize=CODE_CACHE_SIZE)
+def _compile_cached(code: str, allowed_imports: Optional[frozenset]) -> types.CodeType:
+    """Validate and compile ``code``; memoized by ``_compile_rule``."""
+    tree = validate_rule(code, allowed_imports)
+    digest = hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+    return compile(tree, f"<rule:{digest}>", "exec")
 
+def _compile_rule(code: str, allowed_imports: Optional[List[str]] = None) -> types.CodeType:
+    """Return the compiled code object for ``code``, validating and compiling it on first use."""
+    return _compile_cached(code, None if allowed_imports is None else frozenset(allowed_imports))
+
+# Minimal set of safe builtins exposed to rules. Read-only template; each
+# execution works on a copy with its own ``__import__`` added.
+SAFE_BUILTINS = types.MappingProxyType({
+    "True": True,
+    "False": False,
+    "None": None,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "range": range,
+    "len": len,
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "set": set,
+    "tuple": tuple,
+    "Exception": Exception,
+})
+
+def _checked_import(imports, name, globals=None, locals=None, fromlist=(), level=0):
+    """``__import__`` replacement that only admits modules listed in ``imports``."""
+    base = name.split(".")[0]
+    if imports is not None and base not in imports:
+        raise ImportError(f"Import of '{base}' is not allowed")
+    return __import__(name, globals, locals, fromlist, level)
+
+# Target database connections kept open by each sandbox process, keyed by
+# connection string, so later rules against the same database skip the
+# connection handshake; the least recently used one is closed beyond the limit
+TARGET_CONNECTIONS_PER_PROCESS = int(os.getenv("RUNNER_TARGET_CONNECTIONS_PER_PROCESS", "4"))
+_target_connections: "OrderedDict[str, psycopg2.extensions.connection]" = OrderedDict()
+
+def _acquire_target_connection(conn_str: str):
+    """Take this process's idle connection to ``conn_str``, or open a new one."""
+    conn = _target_connections.pop(conn_str, None)
+    if conn is not None:
         try:
-            exec(code, {"__builtins__": safe_builtins}, local_env)
+            # Idle connections may have been dropped by the server meanwhile
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return conn
+        except psycopg2.Error:
+            conn.close()
+    return psycopg2.connect(conn_str)
+
+def _release_target_connection(conn_str: str, conn) -> None:
+    """Keep ``conn`` for the next rule on ``conn_str`` once its session is reset.
+
+    ``reset()`` rolls back whatever the rule left open and restores the
+    connection defaults; ``DISCARD ALL`` also drops temporary tables, prepared
+    statements and advisory locks, so no state carries over between rules.
+    Connections that the rule closed or broke are dropped.
+    """
+    if conn.closed:
+        return
+    try:
+        conn.reset()
+        # DISCARD ALL cannot run inside a transaction block
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("DISCARD ALL")
+        conn.autocommit = False
+    except psycopg2.Error:
+        conn.close()
+        return
+    _target_connections[conn_str] = conn
+    while len(_target_connections) > TARGET_CONNECTIONS_PER_PROCESS:
+        _, stale = _target_connections.popitem(last=False)
+        stale.close()
+
+def _rule_watchdog(done: threading.Event, connection: list) -> None:
+    """Back up the SIGALRM timeout of the rule running in this sandbox process.
+
+    The alarm is only handled between Python bytecodes, so a rule blocked in C
+    code (typically a long query) does not see it. Past the grace period the
+    rule's running query is cancelled; if the rule still does not finish, the
+    process exits. That breaks the pool, which is then replaced, so it is the
+    last resort for rules that ignore the alarm.
+    """
+    if done.wait(RULE_TIMEOUT_SECONDS + RULE_TIMEOUT_GRACE_SECONDS):
+        return
+    for conn in connection:
+        try:
+            conn.cancel()
+        except psycopg2.Error:
+            pass
+    if done.wait(RULE_TIMEOUT_GRACE_SECONDS):
+        return
+    logger.error("Rule ignored its timeout; stopping sandbox process %d", os.getpid())
+    os._exit(1)
+
+def _sandbox_worker(code, conn_str, imports):
+    """Run ``code`` inside a sandbox process and return its result.
+
+    Uses a connection to ``conn_str`` owned by this process (connections cannot
+    be shared with the parent process) and returns the rule's result, or the
+    error message as a string if the rule raised. A rule still running after
+    ``RULE_TIMEOUT_SECONDS`` is interrupted and ``{"error": "timeout"}`` is
+    returned.
+    """
+    # Fresh copy per execution: rules can reach __builtins__ through their
+    # globals, so a shared dict could be altered by one rule for the next
+    safe_builtins = dict(SAFE_BUILTINS)
+    # Allow all imports if ``imports`` is None. Import statements were already
+    # checked by validate_rule(); this also covers direct __import__() calls.
+    safe_builtins["__import__"] = partial(_checked_import, imports)
+
+    # The timeout starts now, when the rule starts running in this process
+    done = threading.Event()
+    connection = []
+    threading.Thread(target=_rule_watchdog, args=(done, connection), daemon=True).start()
+    signal.setitimer(signal.ITIMER_REAL, RULE_TIMEOUT_SECONDS)
+    conn = None
+    try:
+        try:
+            conn = _acquire_target_connection(conn_str) if conn_str else None
+            if conn is not None:
+                connection.append(conn)
+
+            # Locals available to the executed rule
+            local_env = {
+                "target_conn": conn,
+                "pd": pd,
+                "datetime": datetime,
+                "psycopg2": psycopg2,
+            }
+
+            exec(_compile_rule(code, imports), {"__builtins__": safe_builtins}, local_env)
             if "result" in local_env:
-                out["result"] = local_env["result"]
+                return local_env["result"]
             elif "rule" in local_env and callable(local_env["rule"]):
-                out["result"] = local_env["rule"](conn)
-            else:
-                out["result"] = None
-        except Exception as e:  # pragma: no cover - error path
-            out["error"] = str(e)
-
-    manager = multiprocessing.Manager()
-    result_holder = manager.dict()
-    proc = multiprocessing.Process(target=worker, args=(rule_text, target_conn, result_holder, allowed_imports))
-    proc.start()
-    proc.join(3600)  # 1 hour timeout
-    if proc.is_alive():
-        proc.terminate()
-        proc.join()
+                return local_env["rule"](conn)
+            return None
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            done.set()
+    except RuleTimeout:
+        logger.warning("Rule exceeded its timeout of %d seconds", RULE_TIMEOUT_SECONDS)
         return {"error": "timeout"}
+    except Exception as e:  # pragma: no cover - error path
+        return str(e)
+    finally:
+        if conn is not None:
+            _release_target_connection(conn_str, conn)
+        _restore_module_namespaces()
 
-    return result_holder.get("result", result_holder.get("error"))
+def exec_rule_sandbox(rule_text, conn_str, allowed_imports: Optional[List[str]] = None):
+    """Execute ``rule_text`` as Python code against ``conn_str`` in a restricted
+    sandbox.
+
+    The rule runs in a process of the shared sandbox pool, which opens its own
+    connection to ``conn_str`` (no connection is opened when it is empty). A
+    rule that has not finished ``RULE_TIMEOUT_SECONDS`` after it started
+    running is interrupted within its process and ``{"error": "timeout"}`` is
+    returned; other rules in the pool are not affected.
+    A list of ``allowed_imports`` limits which modules may be imported.
+    The executed code should store its result in a variable named ``result`` or
+    provide a callable ``rule`` which returns the result.
+    """
+    executor = _get_executor()
+    future = executor.submit(_sandbox_worker, rule_text, conn_str, allowed_imports)
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        # A sandbox process died (crashed, or stopped by the watchdog after
+        # ignoring its timeout); replace the pool so later rules do not fail
+        # as well
+        _reset_executor(executor)
+        raise
 
 class RunRequest(BaseModel):
     """Payload for the ``/run`` endpoint specifying which rules to execute."""
 
     rule_ids: List[str]
 
+def execute_rule(rule_id, rule_text, conn_str):
+    """Run one rule in the sandbox against its target database.
+
+    Errors raised while running the sandbox (for instance a crashed sandbox
+    process) are returned as ``{"error": ...}`` so that one failing rule does
+    not abort the whole run.
+    """
+    logger.info("Processing rule %s with connection %s", rule_id, conn_str)
+    try:
+        return exec_rule_sandbox(rule_text, conn_str, allowed_imports=DEFAULT_ALLOWED_IMPORTS)
+    except Exception as e:
+        logger.exception("Error executing sandbox for rule %s", rule_id)
+        return {"error": str(e)}
+
+def dumps_json(obj) -> bytes:
+    """Encode ``obj`` as JSON with orjson.
+
+    Non-string dict keys are converted and numpy values (as produced by pandas
+    based rules) are supported natively. Other values orjson cannot encode,
+    such as the ``Decimal`` psycopg2 returns for NUMERIC columns, are written
+    as strings.
+    """
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def encode_result(rule_id, result, conn_str) -> bytes:
+    """Encode the stored and returned entry for one rule.
+
+    A result that still cannot be encoded is replaced by an error entry, so
+    it does not cost the other rules of the request their results.
+    """
+    try:
+        return dumps_json({"result": result, "db_connection": conn_str})
+    except TypeError as e:  # orjson.JSONEncodeError is a TypeError
+        logger.error("Cannot encode the result of rule %s: %s", rule_id, e)
+        return dumps_json({"result": {"error": f"Result is not JSON serializable: {e}"}, "db_connection": conn_str})
+
+def store_results(main_db_url: str, encoded_results: Dict[str, bytes]) -> None:
+    """Insert already encoded results into ``rule_results`` with one batched insert and commit.
+
+    Parameters
+    ----------
+    main_db_url : str
+        Connection string of the main database.
+    encoded_results : dict
+        JSON document (as produced by :func:`dumps_json`) per rule id.
+    """
+    rows_to_insert = [
+        (rule_id, encoded.decode()) for rule_id, encoded in encoded_results.items()
+    ]
+    with pooled_connection(main_db_url) as write_conn:
+        with write_conn.cursor() as write_cur:
+            execute_values(
+                write_cur,
+                "INSERT INTO rule_results (rule_id, result) VALUES %s",
+                rows_to_insert,
+                template="(%s, %s::jsonb)",
+                page_size=RESULTS_PAGE_SIZE,
+            )
+
+def results_response(encoded_results: Dict[str, bytes]) -> Response:
+    """Build the ``{"results": {...}}`` response body from already encoded results.
+
+    The per-rule documents are spliced into one buffer, so every result is
+    serialized only once for both the database and the response.
+    """
+    buf = bytearray(b'{"results":{')
+    for rule_id, encoded in encoded_results.items():
+        buf += orjson.dumps(rule_id)
+        buf += b":"
+        buf += encoded
+        buf += b","
+    if encoded_results:
+        del buf[-1]
+    buf += b"}}"
+    return Response(content=bytes(buf), media_type="application/json")
+
 @app.post("/run")
-def run_rules(request: RunRequest):
+async def run_rules(request: RunRequest):
     """Execute the given rules and store their results.
 
     Each rule is fetched from the main database, executed in an isolated
     subprocess, and the resulting data is written back to ``rule_results``.
+    Rules start while later ones are still being fetched and run concurrently
+    (at most ``MAX_PARALLEL_RULES`` at a time); the blocking database and
+    sandbox calls are moved off the event loop.
     """
     logger.info("run_rules endpoint called")
     logger.info("Received RunRequest with rule_ids=%s", request.rule_ids)
@@ -140,54 +619,45 @@ def run_rules(request: RunRequest):
     if not MAIN_DB_URL:
         raise HTTPException(status_code=500, detail="MAIN_DB_URL env var must be set")
 
-    # Fetch and execute
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_RULES)
+
+    async def run_one(rule_id, rule_text, conn_str):
+        async with semaphore:
+            return await run_in_threadpool(execute_rule, rule_id, rule_text, conn_str)
+
+    # Fetch and execute: each rule is scheduled as soon as its row arrives
+    scheduled = []
     try:
-        rules = fetch_rules(MAIN_DB_URL, request.rule_ids)
+        rows = iterate_in_threadpool(fetch_rules(MAIN_DB_URL, request.rule_ids))
+        async for rule_id, rule_text, conn_str in rows:
+            task = asyncio.ensure_future(run_one(rule_id, rule_text, conn_str))
+            scheduled.append((rule_id, conn_str, task))
     except Exception as e:
         logger.exception("Error fetching rules for rule_ids=%s", request.rule_ids)
+        for _, _, task in scheduled:
+            task.cancel()
         raise HTTPException(status_code=500, detail="Error fetching rules")
-    if not rules:
+    if not scheduled:
         logger.warning("No rules found for rule_ids=%s", request.rule_ids)
         raise HTTPException(status_code=404, detail="No rules found")
 
-    results = {}
-    with psycopg2.connect(MAIN_DB_URL) as write_conn:
-        with write_conn.cursor() as write_cur:
-            for rule_id, rule_text, conn_str in rules:
-                logger.info("Processing rule %s with connection %s", rule_id, conn_str)
-                target_conn = psycopg2.connect(conn_str)
-                try:
-                    try:
-                        result = exec_rule_sandbox(rule_text, target_conn, allowed_imports=DEFAULT_ALLOWED_IMPORTS)
-                    except Exception as e:
-                        logger.exception("Error executing sandbox for rule %s", rule_id)
-                        result = {"error": str(e)}
-                finally:
-                    target_conn.close()
-                results[rule_id] = {
-                    "result": result,
-                    "db_connection": conn_str
-                }
-                write_cur.execute(
-                    "INSERT INTO rule_results (rule_id, result) VALUES (%s, %s)",
-                    (str(rule_id), json.dumps(results[rule_id]))
-                )
-                write_conn.commit()
-                logger.info(
-                    "Result for rule %s committed to database: %s",
-                    rule_id,
-                    results[rule_id]
-                )
-    return {"results": results}
+    outcomes = await asyncio.gather(*(task for _, _, task in scheduled))
+    # Encode each result once; the same JSON is stored and sent back
+    encoded_results = {
+        str(rule_id): encode_result(rule_id, result, conn_str)
+        for (rule_id, conn_str, _), result in zip(scheduled, outcomes)
+    }
+
+    # Store all results with one multi-row INSERT and a single commit
+    await run_in_threadpool(store_results, MAIN_DB_URL, encoded_results)
+    logger.info("Results for %d rules committed to database", len(encoded_results))
+    return results_response(encoded_results)
 
 def run_custom_code(code_str: str, conn_str: str):
     """Execute arbitrary ``code_str`` using a database connection."""
-    conn = psycopg2.connect(conn_str)
-    try:
-        result = exec_rule_sandbox(code_str, conn, allowed_imports=DEFAULT_ALLOWED_IMPORTS)
-    finally:
-        conn.close()
-    print(json.dumps({"result": result}, default=str))
+    result = exec_rule_sandbox(code_str, conn_str, allowed_imports=DEFAULT_ALLOWED_IMPORTS)
+    # Values orjson cannot encode natively (e.g. Decimal) are printed as strings
+    print(dumps_json({"result": result}).decode())
 
 
 if __name__ == "__main__":
@@ -2,6 +2,8 @@ import os, sys, importlib.util
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 spec = importlib.util.spec_from_file_location("run_rules", os.path.join(ROOT, "runner", "run-rules.py"))
 run_rules = importlib.util.module_from_spec(spec)
+# Registered so the sandbox pool can pickle the module's functions by name
+sys.modules[spec.name] = run_rules
 spec.loader.exec_module(run_rules)
 
 def test_exec_rule_sandbox_restricts_imports():
@@ -12,3 +14,154 @@ def test_exec_rule_sandbox_restricts_imports():
     code_bad = "import os\nresult = 'bad'"
     res2 = run_rules.exec_rule_sandbox(code_bad, None, allowed_imports=['math'])
     assert "not allowed" in str(res2)
+
+def test_rule_timeout_only_stops_the_slow_rule(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    # One sandbox process with a short timeout; the timeout only applies to
+    # new pools, so replace the shared one for this test
+    run_rules.shutdown_executor()
+    monkeypatch.setattr(run_rules, "MAX_PARALLEL_RULES", 1)
+    monkeypatch.setattr(run_rules, "RULE_TIMEOUT_SECONDS", 2)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            slow = pool.submit(run_rules.exec_rule_sandbox, "while True:\n    pass", None, [])
+            # Queued behind the slow rule for 2 seconds, then runs for 1.5
+            healthy = pool.submit(
+                run_rules.exec_rule_sandbox, "import time\ntime.sleep(1.5)\nresult = 'ok'", None, ["time"]
+            )
+            assert slow.result() == {"error": "timeout"}
+            assert healthy.result() == "ok"
+    finally:
+        run_rules.shutdown_executor()
+
+def test_module_changes_do_not_leak_to_the_next_rule(monkeypatch):
+    # A single sandbox process, so both rules share it
+    run_rules.shutdown_executor()
+    monkeypatch.setattr(run_rules, "MAX_PARALLEL_RULES", 1)
+    try:
+        allowed = run_rules.DEFAULT_ALLOWED_IMPORTS
+        assert run_rules.exec_rule_sandbox("pd.DataFrame = None\npd.extra = 1\nresult = 1", None, allowed) == 1
+        assert run_rules.exec_rule_sandbox(
+            "import pandas\nresult = pandas.DataFrame is not None and 'extra' not in pd.__dict__", None, allowed
+        ) is True
+    finally:
+        run_rules.shutdown_executor()
+
+def test_pooled_connection_reuses_pool_per_dsn(monkeypatch):
+    from unittest.mock import MagicMock
+    pool_cls = MagicMock()
+    monkeypatch.setattr(run_rules, "ThreadedConnectionPool", pool_cls)
+    monkeypatch.setattr(run_rules, "_pools", {})
+    monkeypatch.setattr(run_rules, "_pool_slots", {})
+    conn = pool_cls.return_value.getconn.return_value
+    conn.closed = 0
+
+    for _ in range(2):
+        with run_rules.pooled_connection("postgresql://main") as borrowed:
+            assert borrowed is conn
+
+    pool_cls.assert_called_once_with(1, run_rules.DB_POOL_MAX, "postgresql://main")
+    assert pool_cls.return_value.putconn.call_count == 2
+    pool_cls.return_value.putconn.assert_called_with(conn, close=False)
+
+def test_pooled_connection_waits_when_pool_is_exhausted(monkeypatch):
+    import threading
+    import time
+    from unittest.mock import MagicMock
+    from psycopg2.pool import PoolError
+    borrowed = []
+
+    def getconn():
+        # Like ThreadedConnectionPool: no waiting, an error once all are taken
+        if len(borrowed) >= 2:
+            raise PoolError("connection pool exhausted")
+        conn = MagicMock(closed=0)
+        borrowed.append(conn)
+        return conn
+
+    pool_cls = MagicMock()
+    pool_cls.return_value.getconn.side_effect = getconn
+    pool_cls.return_value.putconn.side_effect = lambda conn, close: borrowed.remove(conn)
+    monkeypatch.setattr(run_rules, "ThreadedConnectionPool", pool_cls)
+    monkeypatch.setattr(run_rules, "_pools", {})
+    monkeypatch.setattr(run_rules, "_pool_slots", {})
+    monkeypatch.setattr(run_rules, "DB_POOL_MAX", 2)
+
+    release = threading.Event()
+    errors = []
+
+    def borrow(hold):
+        try:
+            with run_rules.pooled_connection("postgresql://main"):
+                if hold:
+                    release.wait()
+        except Exception as e:
+            errors.append(e)
+
+    holders = [threading.Thread(target=borrow, args=(True,)) for _ in range(2)]
+    for t in holders:
+        t.start()
+    while len(borrowed) < 2:
+        time.sleep(0.01)
+    # A third caller waits for a returned connection instead of failing
+    waiter = threading.Thread(target=borrow, args=(False,))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    release.set()
+    for t in holders + [waiter]:
+        t.join(5)
+    assert not waiter.is_alive()
+    assert errors == [] and borrowed == []
+
+def test_compile_rule_caches_code_objects():
+    code = "result = 1 + 1"
+    assert run_rules._compile_rule(code) is run_rules._compile_rule(code)
+    assert run_rules._compile_rule("result = 2") is not run_rules._compile_rule(code)
+
+def test_validate_rule_checks_imports_before_running():
+    run_rules.validate_rule("import math\nfrom datetime import date", allowed_imports=['math', 'datetime'])
+    for code in ("from os import path", "import math, os.path", "from . import x"):
+        try:
+            run_rules.validate_rule(code, allowed_imports=['math'])
+        except ImportError as e:
+            assert "not allowed" in str(e)
+        else:
+            raise AssertionError(f"{code!r} was accepted")
+
+def test_fetch_rules_serves_recent_rules_from_cache(monkeypatch):
+    from contextlib import contextmanager
+    from unittest.mock import MagicMock
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.__iter__.side_effect = lambda: iter([("r1", "result = 1", "postgresql://target")])
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+
+    @contextmanager
+    def fake_connection(dsn):
+        yield conn
+
+    monkeypatch.setattr(run_rules, "pooled_connection", fake_connection)
+    monkeypatch.setattr(run_rules, "_rule_cache", run_rules.TTLCache(maxsize=10, ttl=60))
+
+    expected = [("r1", "result = 1", "postgresql://target")]
+    assert list(run_rules.fetch_rules("postgresql://main", ["r1"])) == expected
+    assert list(run_rules.fetch_rules("postgresql://main", ["r1"])) == expected
+    cursor.execute.assert_called_once()
+
+def test_results_response_reuses_encoded_results():
+    import json
+    encoded = {"r1": run_rules.dumps_json({"result": {1: "a"}}), "r2": run_rules.dumps_json({"result": None})}
+    response = run_rules.results_response(encoded)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"results": {"r1": {"result": {"1": "a"}}, "r2": {"result": None}}}
+    assert json.loads(run_rules.results_response({}).body) == {"results": {}}
+
+def test_encode_result_handles_values_orjson_cannot_encode():
+    import json
+    from decimal import Decimal
+    assert json.loads(run_rules.encode_result("r1", Decimal("2.5"), "dsn")) == {"result": "2.5", "db_connection": "dsn"}
+    # Integers beyond 64 bits cannot be encoded at all; only this rule gets an error
+    failed = json.loads(run_rules.encode_result("r2", 2 ** 70, "dsn"))
+    assert "not JSON serializable" in failed["result"]["error"]
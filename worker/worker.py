@@ -4,7 +4,8 @@ worker.py: Celery worker service for scheduling and dispatching data quality rul
 This module defines a Celery application that, every minute, retrieves the
 active rules from the database along with their last execution times and
 configured intervals. It calculates which rules are due for execution and
-dispatches each to an external HTTP-based rule-runner service. Results
+dispatches them, batched per target database connection, to an external
+HTTP-based rule-runner service. Results
 are persisted back into the database for audit and reporting.
 """
 
@@ -12,11 +13,20 @@ are persisted back into the database for audit and reporting.
 from celery import Celery
 # Import Celery scheduling utilities for defining periodic tasks
 from celery.schedules import crontab
-# Standard libraries: datetime for timestamps, uuid/random for IDs,
-# json/os for serialization and environment access, psycopg2 for PostgreSQL
-import datetime, uuid, random, json, os, psycopg2
-# HTTP client library used to call the rule-runner endpoint
+# Standard libraries: datetime for timestamps, os for environment access,
+# psycopg2 for PostgreSQL
+import datetime, os, psycopg2
+# Batch insert helper and JSON parameter adapter for psycopg2
+from psycopg2.extras import Json, execute_values
+# Fast JSON encoder for the stored results
+import orjson
+# Grouping of due rules by target database connection
+from collections import defaultdict
+# HTTP client library used to call the rule-runner endpoint, and a thread pool
+# to have several calls in flight at once
 import requests
+import functools
+from concurrent.futures import ThreadPoolExecutor
 # Logging framework for structured and leveled log output
 import logging
 logger = logging.getLogger(__name__)
@@ -36,77 +46,167 @@ app.conf.beat_schedule = {
     },
 }
 
+def dumps_json(obj):
+    """Encode ``obj`` as JSON text with orjson (used for the JSONB result column)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Maximum number of rule-runner requests in flight at once per check_rules run
+DISPATCH_CONCURRENCY = int(os.getenv('WORKER_DISPATCH_CONCURRENCY', '16'))
+
+# Per-rule time limit of the rule runner; read from the same variable as the
+# runner's own setting so both stay in line
+RULE_TIMEOUT_SECONDS = int(os.getenv('RUNNER_RULE_TIMEOUT_SECONDS', '3600'))
+# Seconds allowed on top of the rules' run time for the runner's timeout
+# handling, fetching the rules and storing the results
+RUNNER_TIMEOUT_MARGIN_SECONDS = int(os.getenv('WORKER_RUNNER_TIMEOUT_MARGIN_SECONDS', '120'))
+# Seconds to wait for a connection to the rule runner
+RUNNER_CONNECT_TIMEOUT_SECONDS = int(os.getenv('WORKER_RUNNER_CONNECT_TIMEOUT_SECONDS', '10'))
+
+def runner_timeout(dispatched_rules):
+    """
+    Return the ``(connect, read)`` timeout for the /run requests of one
+    check_rules run that dispatches ``dispatched_rules`` rules in total.
+
+    The batches of a run are sent at the same time and share the runner's
+    sandbox processes, so a batch may wait behind the rules of the other
+    batches. The read timeout therefore allows every dispatched rule its full
+    ``RULE_TIMEOUT_SECONDS`` as if all of them ran one after another. This
+    covers the worker's own batches only: if the runner is also busy with
+    other requests (an overlapping check_rules run, manual runs), a batch can
+    still time out while the runner keeps working on it. Its rules then get
+    a timeout error row from the worker in addition to the rows the runner
+    stores.
+    """
+    return (
+        RUNNER_CONNECT_TIMEOUT_SECONDS,
+        RULE_TIMEOUT_SECONDS * dispatched_rules + RUNNER_TIMEOUT_MARGIN_SECONDS,
+    )
+
+# Shared HTTP session for the rule-runner calls. It keeps connections alive
+# between requests and across task runs of the same worker process, so only
+# the first call pays for the TCP (and TLS) handshake. The pool holds one
+# connection per concurrent dispatch thread.
+runner_session = requests.Session()
+_runner_adapter = requests.adapters.HTTPAdapter(pool_maxsize=DISPATCH_CONCURRENCY)
+runner_session.mount('http://', _runner_adapter)
+runner_session.mount('https://', _runner_adapter)
+
+def dispatch_rules(runner_url, db_conn_id, rule_ids, timeout):
+    """
+    Ask the rule-runner service to execute a batch of rules that share one
+    target database connection, and return one result per rule id.
+    ``timeout`` is the ``(connect, read)`` timeout of the request (see
+    ``runner_timeout``).
+
+    Each result keeps the shape of the runner's response
+    (``{"results": {rule_id: ...}}``) restricted to that rule. Errors
+    (connection failures, timeouts, non-2xx answers) are logged and returned
+    as ``{"error": ...}`` for every rule of the batch so they are stored like
+    any other result.
+    """
+    payload = {"db_conn_id": str(db_conn_id), "rule_ids": [str(rule_id) for rule_id in rule_ids]}
+    try:
+        resp = runner_session.post(runner_url, json=payload, timeout=timeout)
+        resp.raise_for_status()
+        logger.info("HTTP request succeeded for %d rules on connection %s", len(rule_ids), db_conn_id)
+        runner_results = resp.json().get("results", {})
+        logger.info("Received results for connection %s: %s", db_conn_id, runner_results)
+    except Exception as e:
+        logger.error("Error during HTTP request for connection %s: %s", db_conn_id, e)
+        return [{"error": str(e)} for _ in rule_ids]
+    results = []
+    for rule_id in rule_ids:
+        key = str(rule_id)
+        if key in runner_results:
+            results.append({"results": {key: runner_results[key]}})
+        else:
+            results.append({"error": "no result returned by the rule runner"})
+    return results
+
 # Register 'check_rules' as a periodic Celery task
 @app.task
 def check_rules():
     """
-    This task connects to the PostgreSQL database, retrieves all active rules,
-    determines which are due to run based on their interval and last run time,
-    then calls the rule-runner HTTP service for each due rule.
+    This task connects to the PostgreSQL database, retrieves the active rules
+    that are due to run based on their interval and last run time, then calls
+    the rule-runner HTTP service once per target connection of the due rules.
     """
     # Log the start of the scheduled task execution
     logger.info("check_rules task started")
-    # Establish a database connection using the DATABASE_URL environment variable
+    # Establish a database connection using the DATABASE_URL environment variable.
+    # The same connection serves the due-rule query and the result insert.
     conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-    cur = conn.cursor()
+    try:
+        _check_rules(conn)
+    finally:
+        conn.close()
 
-    # Retrieve each rule's configured interval and compute its last execution time
+def _check_rules(conn):
+    """Select the due rules, dispatch them and store the results using ``conn``."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    # Select the rules that are due: a rule is due once its interval has passed
+    # since its last execution (or its creation, if it never ran). Interval names
+    # are resolved through an inline lookup table; unknown intervals fall back to
+    # one minute. The comparison runs in Postgres, so only due rule ids are sent
+    # back instead of every active rule.
     sql = """
-        SELECT r.id, r.interval,
-               COALESCE(MAX(rr.last_run), r.created_at) AS last_run
+        SELECT r.id, r.db_connection_id
         FROM column_rules r
         LEFT JOIN rule_results rr ON r.id = rr.rule_id
+        LEFT JOIN (
+            VALUES ('minutely', INTERVAL '1 minute'),
+                   ('hourly', INTERVAL '1 hour'),
+                   ('daily', INTERVAL '1 day')
+        ) AS iv(name, delta) ON iv.name = r.interval
         WHERE r.active = TRUE
-        GROUP BY r.id, r.interval, r.created_at
+        GROUP BY r.id, r.db_connection_id, r.created_at, iv.delta
+        HAVING COALESCE(MAX(rr.last_run), r.created_at)
+               + COALESCE(iv.delta, INTERVAL '1 minute') <= %(now)s
     """
-    cur.execute(sql)
-    rows = cur.fetchall()
-
-    # Map human-readable intervals to timedelta objects for scheduling logic
-    interval_map = {
-        'hourly': datetime.timedelta(hours=1),
-        'daily': datetime.timedelta(days=1),
-        'minutely': datetime.timedelta(minutes=1)
-    }
+    # Leaving the ``with conn`` block ends the read transaction, so the
+    # connection does not sit idle in a transaction during the HTTP calls
+    with conn, conn.cursor() as cur:
+        cur.execute(sql, {"now": now})
+        due_rules = cur.fetchall()
+    logger.info("%d rules are due", len(due_rules))
 
-    now = datetime.datetime.now(datetime.timezone.utc)
-    due_rules = []
+    runner_url = os.getenv("RULE_RUNNER_URL", "http://rule-runner.valiax.svc.cluster.local/run")
 
-    # Iterate over all rules and determine which are due based on the current time
-    for rule_id, interval_str, last_run in rows:
-        next_run = last_run + interval_map.get(interval_str, datetime.timedelta(minutes=1))
-        if now < next_run:
-            logger.info("Rule %s not due until %s", rule_id, next_run)
-            continue
-        due_rules.append(rule_id)
+    if not due_rules:
+        return
 
-    # Close database resources before sending HTTP requests to the rule-runner
-    cur.close()
-    conn.close()
+    # Group the due rules by their target database connection so that the
+    # runner executes each group with a single /run request
+    batches = defaultdict(list)
+    for rule_id, db_conn_id in due_rules:
+        batches[db_conn_id].append(rule_id)
 
-    runner_url = os.getenv("RULE_RUNNER_URL", "http://rule-runner.valiax.svc.cluster.local/run")
+    # Send one HTTP POST per connection to the external rule-runner service.
+    # The requests are independent and spend their time waiting on the runner,
+    # so they are sent in parallel from a small thread pool.
+    # Until this run stores its results, the dispatched rules have no new
+    # rule_results row and still count as due, so check_rules runs started
+    # meanwhile (every minute) dispatch them again.
+    timeout = runner_timeout(len(due_rules))
+    workers = min(DISPATCH_CONCURRENCY, len(batches))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        batch_results = pool.map(
+            functools.partial(dispatch_rules, runner_url, timeout=timeout), batches.keys(), batches.values()
+        )
+        pending = [
+            (now, rule_id, Json(result, dumps=dumps_json))
+            for (_, rule_ids), results in zip(batches.items(), batch_results)
+            for rule_id, result in zip(rule_ids, results)
+        ]
 
-    # Send an HTTP POST for each due rule to the external rule-runner service
-    for rule_id in due_rules:
-        payload = {"db_conn_id": str(rule_id), "rule_ids": [rule_id]}
-        try:
-            resp = requests.post(runner_url, json=payload, timeout=300)
-            resp.raise_for_status()
-            logger.info("HTTP request succeeded for rule %s", rule_id)
-            result = resp.json()
-            logger.info("Received result for rule %s: %s", rule_id, result)
-        except Exception as e:
-            logger.error("Error during HTTP request for rule %s: %s", rule_id, e)
-            result = {"error": str(e)}
-
-        # Reconnect to the database and persist each rule execution result
-        conn = psycopg2.connect(os.getenv('DATABASE_URL'))
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO rule_results (last_run, rule_id, result) VALUES (%s, %s, %s)",
-            (now, rule_id, json.dumps(result))
+    # Persist all rule execution results with a single multi-row INSERT and
+    # one commit
+    with conn, conn.cursor() as cur:
+        execute_values(
+            cur,
+            "INSERT INTO rule_results (last_run, rule_id, result) VALUES %s",
+            pending,
+            page_size=500,
         )
-        conn.commit()
-        logger.info("Result for rule %s committed to database", rule_id)
-        cur.close()
-        conn.close()
\ No newline at end of file
+    logger.info("Results for %d rules committed to database", len(pending))